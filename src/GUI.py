@@ -1,25 +1,19 @@
 import logging
 import os
-import xml.etree.ElementTree as ET
 from tkinter import filedialog, messagebox
 
 import globals
 from canvas_operations import clear_hints, render_uml_diagram
 from config import FILE_TYPES
-from state_manager import read_transitions_from_file
-from svg_parser import (
-    get_elements,
-    get_hierarchy,
-    identify_xml_type,
-    parse_svg,
-    parse_svg2,
-)
-from utilities import get_svg_dimensions, update_transition_display
+from dialogs import update_transition_display
+from model_cache import load_diagram_model
+from state_manager import compile_transition_table
+from state_model import get_state_model
+from svg_parser import get_elements, get_hierarchy
 
 
 def choose_file(canvas, transition_trace_label, reset_button, undo_button):
     ELEMENTS = get_elements()
-    STATE_HIERARCHY = get_hierarchy()
 
     file_path = filedialog.askopenfilename(filetypes=FILE_TYPES)
     if not file_path:
@@ -73,33 +67,28 @@ def choose_file(canvas, transition_trace_label, reset_button, undo_button):
 
     globals.loaded_svg_content = get_modified_svg_content()
     if globals.loaded_svg_content:
-        globals.current_state = {"active": None, "remembered": None}
+        globals.current_configuration = None
         globals.transition_trace.clear()
         globals.state_stack.clear()
         update_transition_display(transition_trace_label, reset_button, undo_button)
         clear_hints(canvas)
         globals.hints_visible = False
         globals.is_svg_updated = True
-        globals.original_width, globals.original_height = get_svg_dimensions(
-            globals.loaded_svg_content
-        )
-    tree = ET.parse(globals.svg_rainbow_file_path)
-    root = tree.getroot()
-    globals.xml_type = identify_xml_type(root)
-
-    if globals.xml_type == "Type1":
-        canvas.delete("all")
-        ELEMENTS, STATE_HIERARCHY = parse_svg(globals.svg_rainbow_file_path)
-    elif globals.xml_type == "Type2":
-        canvas.delete("all")
-        ELEMENTS, STATE_HIERARCHY = parse_svg2(globals.svg_rainbow_file_path)
-    else:
-        logging.error("Unknown file type")
-        return False
 
-    globals.current_state, globals.transitions = read_transitions_from_file(
-        globals.transitions_file_path
+    canvas.delete("all")
+    model = load_diagram_model(
+        globals.svg_file_path,
+        globals.svg_rainbow_file_path,
+        globals.transitions_file_path,
     )
+    globals.xml_type = model["xml_type"]
+    globals.original_width, globals.original_height = model["dimensions"]
+    globals.transitions = model["transitions"]
+    globals.current_configuration = get_state_model(
+        globals.transitions, globals.initial_state_key
+    ).initial
+    compile_transition_table(globals.transitions, get_hierarchy())
+    ELEMENTS = model["elements"]
 
     if ELEMENTS:
         max_x = max(state[1][1] for state in ELEMENTS)
@@ -107,8 +96,6 @@ def choose_file(canvas, transition_trace_label, reset_button, undo_button):
         canvas.config(width=max_x + 20, height=max_y + 20)
 
     render_uml_diagram(canvas)
-    canvas.update_idletasks()
-    canvas.config(scrollregion=canvas.bbox("all"))
     return True
 
 
@@ -134,9 +121,9 @@ def toggle_color_mode(canvas):
 
 def reset_trace(transition_trace_label, reset_button, undo_button, canvas):
     if globals.state_stack:
-        globals.current_state = globals.state_stack[0].copy()
+        globals.current_configuration = globals.state_stack[0]
     else:
-        globals.current_state = {"active": None, "remembered": None}
+        globals.current_configuration = None
 
     globals.state_stack.clear()
 
@@ -153,11 +140,12 @@ def undo_last_transition(transition_trace_label, reset_button, undo_button, canv
     if globals.transition_trace:
         if globals.state_stack:
             previous_state = globals.state_stack.pop()
-            globals.current_state = previous_state.copy()
+            globals.current_configuration = previous_state
         else:
-            globals.current_state = {"active": None, "remembered": None}
+            previous_state = None
+            globals.current_configuration = None
 
-        if previous_state:
+        if previous_state is not None:
             globals.transition_trace.pop()
 
             update_transition_display(transition_trace_label, reset_button, undo_button)
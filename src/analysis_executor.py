@@ -0,0 +1,141 @@
+import logging
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from tkinter import messagebox
+
+from analysis_progress import AnalysisProgress
+from config import (
+    ANALYSIS_POLL_INTERVAL,
+    ANALYSIS_START_METHOD,
+    ANALYSIS_TIME_BUDGET,
+)
+from graph_analysis import decide_graph_analysis
+
+ANALYSIS_TITLES = {
+    "reachability": "Reachability Analysis:",
+    "node": "Maximum node analysis:",
+    "transition": "Maximum transition analysis:",
+    "longest": "Longest Path Analysis:",
+}
+
+progress_queue = None
+cancel_event = None
+
+
+def init_worker(worker_progress_queue, worker_cancel_event):
+    global progress_queue, cancel_event
+    progress_queue = worker_progress_queue
+    cancel_event = worker_cancel_event
+
+
+def run_analysis(mode, transitions, initial_state_key, time_budget):
+    progress = AnalysisProgress(time_budget, progress_queue, cancel_event)
+    results = []
+    decide_graph_analysis(
+        mode,
+        transitions,
+        initial_state_key,
+        lambda title, content: results.append((title, content)),
+        progress,
+    )
+
+    title, content = results[-1]
+    if progress.stopped:
+        content += f"\n\n{progress.stop_reason}: showing the best result found so far"
+    return title, content
+
+
+class AnalysisExecutor:
+    def __init__(self, app, show_results, on_running, time_budget=ANALYSIS_TIME_BUDGET):
+        self.app = app
+        self.show_results = show_results
+        self.on_running = on_running
+        self.time_budget = time_budget
+        self.pool = None
+        self.future = None
+        self.mode = None
+        self.discard = False
+        self.context = multiprocessing.get_context(ANALYSIS_START_METHOD)
+        self.progress_queue = self.context.Queue()
+        self.cancel_event = self.context.Event()
+
+    @property
+    def running(self):
+        return self.future is not None
+
+    def submit(self, mode, transitions, initial_state_key):
+        if self.future is not None:
+            return
+        if initial_state_key is None:
+            messagebox.showerror("Error", "Initial state not set.")
+            return
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self.context,
+                initializer=init_worker,
+                initargs=(self.progress_queue, self.cancel_event),
+            )
+
+        self.latest_progress()
+        self.cancel_event.clear()
+        self.mode = mode
+        self.discard = False
+        self.future = self.pool.submit(
+            run_analysis, mode, transitions, initial_state_key, self.time_budget
+        )
+        self.on_running(True)
+        self.app.after(ANALYSIS_POLL_INTERVAL, self.poll)
+
+    def latest_progress(self):
+        latest = None
+        while True:
+            try:
+                latest = self.progress_queue.get_nowait()
+            except queue.Empty:
+                return latest
+
+    def poll(self):
+        latest = self.latest_progress()
+        if not self.future.done():
+            if latest is not None and not self.discard:
+                explored, best = latest
+                self.show_results(
+                    ANALYSIS_TITLES[self.mode],
+                    f"\nRunning... explored {explored} search states, "
+                    f"best coverage so far {best}",
+                )
+            self.app.after(ANALYSIS_POLL_INTERVAL, self.poll)
+            return
+
+        future, self.future = self.future, None
+        self.on_running(False)
+        try:
+            title, content = future.result()
+        except BrokenProcessPool as e:
+            logging.error("Analysis worker died: %s", str(e))
+            self.pool.shutdown(wait=False)
+            self.pool = None
+            messagebox.showerror("Error", f"Analysis failed: {e}")
+            return
+        except Exception as e:
+            logging.error("Analysis failed: %s", str(e))
+            messagebox.showerror("Error", f"Analysis failed: {e}")
+            return
+
+        if not self.discard:
+            self.show_results(title, content)
+
+    def cancel(self, discard=False):
+        if self.future is not None:
+            self.discard |= discard
+            self.cancel_event.set()
+
+    def shutdown(self):
+        self.cancel_event.set()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,30 @@
+import time
+
+from config import ANALYSIS_PROGRESS_INTERVAL
+
+
+class AnalysisProgress:
+    def __init__(self, time_budget, progress_queue=None, cancel_event=None):
+        self.progress_queue = progress_queue
+        self.cancel_event = cancel_event
+        self.deadline = time.monotonic() + time_budget
+        self.next_report = 0
+        self.stopped = False
+        self.stop_reason = None
+
+    def tick(self, explored, best):
+        if explored < self.next_report:
+            return self.stopped
+        self.next_report = explored + ANALYSIS_PROGRESS_INTERVAL
+
+        if self.progress_queue is not None:
+            self.progress_queue.put((explored, best))
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.stop("Cancelled")
+        elif time.monotonic() > self.deadline:
+            self.stop("Time budget reached")
+        return self.stopped
+
+    def stop(self, reason):
+        self.stopped = True
+        self.stop_reason = reason
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import globals
+from analysis_progress import AnalysisProgress
+from config import (
+    ANALYSIS_TIME_BUDGET,
+    ANALYSIS_WORKERS,
+    LONGEST_PATH_DISPLAY_LIMIT,
+)
+from graph_analysis import perform_reachability_analysis
+from longest_path import LongestPathSearch
+from state_model import get_state_model
+from svg_parser import load_svg
+from transition_cover import find_max_transition_walk
+from utilities import read_transitions_from_file
+from walk_search import find_max_node_walk
+
+TRANSITIONS_SUFFIX = "_flattened.txt"
+CSV_FIELDS = [
+    "name",
+    "configurations",
+    "transitions",
+    "reachable",
+    "unreachable",
+    "max_node_coverage",
+    "max_node_upper_bound",
+    "max_node_exact",
+    "max_node_beam",
+    "max_transition_coverage",
+    "max_transition_total",
+    "longest_path_length",
+    "longest_path_exact",
+    "svg_states",
+    "seconds",
+    "error",
+]
+
+
+def diagram_files(directory):
+    pattern = os.path.join(directory, f"*{TRANSITIONS_SUFFIX}")
+    for transitions_path in sorted(glob.glob(pattern)):
+        name = os.path.basename(transitions_path)[: -len(TRANSITIONS_SUFFIX)]
+        svg_path = os.path.join(directory, f"{name}_rainbow.svg")
+        yield name, transitions_path, svg_path if os.path.exists(svg_path) else None
+
+
+def analyze_diagram(name, transitions_path, svg_path, time_budget=ANALYSIS_TIME_BUDGET):
+    started = time.perf_counter()
+    globals.current_state = {"active": [], "remembered": []}
+    globals.initial_state_key = None
+    _, transitions = read_transitions_from_file(transitions_path)
+    initial_state_key = globals.initial_state_key
+    model = get_state_model(transitions, initial_state_key)
+
+    result = {
+        "name": name,
+        "transitions_file": transitions_path,
+        "initial_state": initial_state_key,
+        "configurations": len(model.configurations),
+        "transitions": sum(len(successors) for successors in model.successors),
+    }
+
+    if svg_path is not None:
+        xml_type, elements, _, _ = load_svg(svg_path)
+        result["svg"] = {
+            "file": svg_path,
+            "xml_type": xml_type,
+            "states": len(elements),
+        }
+
+    if model.initial is None:
+        result["error"] = "Initial state not set."
+        return result
+
+    reachable, unreachable = perform_reachability_analysis(
+        transitions, initial_state_key
+    )
+    result["reachability"] = {
+        "reachable": sorted(reachable),
+        "unreachable": sorted(unreachable),
+    }
+
+    progress = AnalysisProgress(time_budget)
+    node = find_max_node_walk(model, progress, workers=1)
+    result["max_node"] = {
+        "coverage": node["coverage"],
+        "upper_bound": node["upper_bound"],
+        "exact": node["exact"],
+        "beam": node["beam"],
+        "stop_reason": progress.stop_reason,
+        "walk": [model.configuration_name(state) for state in node["walk"]],
+        "labels": [label for _, _, label in node["path"]],
+    }
+
+    transition = find_max_transition_walk(model)
+    walk = [model.initial] + [destination for _, destination, _ in transition["path"]]
+    result["max_transition"] = {
+        "coverage": transition["coverage"],
+        "transition_count": transition["transition_count"],
+        "walk": [model.configuration_name(state) for state in walk],
+        "labels": [label for _, _, label in transition["path"]],
+    }
+
+    search = LongestPathSearch(model)
+    result["longest_path"] = {
+        "length": search.length,
+        "exact": search.exact,
+        "paths": [
+            [label for _, _, label in path]
+            for path in islice(search.paths(), LONGEST_PATH_DISPLAY_LIMIT)
+        ],
+    }
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(directory, workers=ANALYSIS_WORKERS, time_budget=ANALYSIS_TIME_BUDGET):
+    diagrams = list(diagram_files(directory))
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(analyze_diagram, *diagram, time_budget) for diagram in diagrams
+        ]
+        for (name, _, _), future in zip(diagrams, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logging.error("Analysis of %s failed: %s", name, str(e))
+                results.append({"name": name, "error": str(e)})
+
+    return results
+
+
+def csv_row(result):
+    reachability = result.get("reachability", {})
+    max_node = result.get("max_node", {})
+    max_transition = result.get("max_transition", {})
+    longest_path = result.get("longest_path", {})
+    return {
+        "name": result["name"],
+        "configurations": result.get("configurations"),
+        "transitions": result.get("transitions"),
+        "reachable": len(reachability.get("reachable", [])),
+        "unreachable": len(reachability.get("unreachable", [])),
+        "max_node_coverage": max_node.get("coverage"),
+        "max_node_upper_bound": max_node.get("upper_bound"),
+        "max_node_exact": max_node.get("exact"),
+        "max_node_beam": max_node.get("beam"),
+        "max_transition_coverage": max_transition.get("coverage"),
+        "max_transition_total": max_transition.get("transition_count"),
+        "longest_path_length": longest_path.get("length"),
+        "longest_path_exact": longest_path.get("exact"),
+        "svg_states": result.get("svg", {}).get("states"),
+        "seconds": result.get("seconds"),
+        "error": result.get("error"),
+    }
+
+
+def write_json(results, file):
+    json.dump(results, file, indent=2)
+    file.write("\n")
+
+
+def write_csv(results, file):
+    writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for result in results:
+        writer.writerow(csv_row(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run all graph analyses on every diagram in a directory."
+    )
+    parser.add_argument("directory", help="directory containing *_flattened.txt files")
+    parser.add_argument("--json", help="write full results as JSON to this file")
+    parser.add_argument("--csv", help="write a summary table as CSV to this file")
+    parser.add_argument("-w", "--workers", type=int, default=ANALYSIS_WORKERS)
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=ANALYSIS_TIME_BUDGET,
+        help="seconds the maximum node search may take per diagram",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level="WARNING", format="%(levelname)s:%(message)s")
+    results = run_batch(args.directory, args.workers, args.time_budget)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            write_json(results, file)
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            write_csv(results, file)
+    if not args.json and not args.csv:
+        write_json(results, sys.stdout)
+
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import argparse
+import copy
+import gc
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import globals
+import state_manager
+from config import XML_TYPE_1
+from graph_analysis import perform_reachability_analysis
+from longest_path import LongestPathSearch
+from state_manager import compile_transition_table, state_parameter
+from state_model import StateModel, get_state_model
+from svg_parser import build_state_hierarchy, get_hierarchy, load_svg
+from transition_cover import find_max_transition_walk
+from utilities import read_transitions_from_file
+from walk_search import find_max_node_walk
+
+BENCHMARK_REPEAT = 5
+SIMULATION_CLICKS = 200
+SYNTHETIC_SIZES = (50, 200, 1000)
+HIERARCHY_SIZES = (1000, 2000, 4000, 8000)
+SYNTHETIC_DEGREE = 3
+REGRESSION_THRESHOLD = 1.25
+REGRESSION_MIN_SECONDS = 0.001
+
+
+@contextmanager
+def headless_dialogs():
+    saved = (
+        state_manager.ask_user_for_transition,
+        state_manager.update_transition_display,
+        state_manager.messagebox.showinfo,
+    )
+    state_manager.ask_user_for_transition = lambda transitions, parent: min(transitions)
+    state_manager.update_transition_display = lambda *args: None
+    state_manager.messagebox.showinfo = lambda *args: None
+    try:
+        yield
+    finally:
+        (
+            state_manager.ask_user_for_transition,
+            state_manager.update_transition_display,
+            state_manager.messagebox.showinfo,
+        ) = saved
+
+
+def measure(function, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_seconds": min(times),
+        "median_seconds": statistics.median(times),
+        "peak_bytes": peak,
+        "retained_blocks": sys.getallocatedblocks() - blocks,
+    }
+
+
+def load_transitions(file_path):
+    globals.current_state = {"active": [], "remembered": []}
+    globals.initial_state_key = None
+    current_state, transitions = read_transitions_from_file(file_path)
+    return copy.deepcopy(current_state), transitions, globals.initial_state_key
+
+
+def simulate_clicks(start_configuration, names, clicks, seed):
+    rng = random.Random(seed)
+    globals.current_configuration = start_configuration
+    globals.transition_trace = []
+    globals.state_stack = []
+    for _ in range(clicks):
+        state_parameter(rng.choice(names), None, None, None, None)
+
+
+def analysis_benchmarks(name, transitions, initial_state_key):
+    def model():
+        return StateModel(transitions, initial_state_key)
+
+    yield f"analysis/reachability/{name}", lambda: perform_reachability_analysis(
+        transitions, initial_state_key
+    )
+    yield f"analysis/max_node/{name}", lambda: find_max_node_walk(model(), workers=1)
+    yield f"analysis/max_transition/{name}", lambda: find_max_transition_walk(model())
+    yield f"analysis/longest_path/{name}", lambda: LongestPathSearch(model())
+
+
+def example_benchmarks(directory):
+    pattern = os.path.join(directory, "*_flattened.txt")
+    for transitions_path in sorted(glob.glob(pattern)):
+        name = os.path.basename(transitions_path)[: -len("_flattened.txt")]
+        rainbow_path = os.path.join(directory, f"{name}_rainbow.svg")
+
+        _, transitions, initial_state_key = load_transitions(transitions_path)
+        yield f"read_transitions/{name}", lambda: load_transitions(transitions_path)
+
+        if os.path.exists(rainbow_path):
+            xml_type, elements, _, _ = load_svg(rainbow_path)
+            parser = "parse_svg" if xml_type == XML_TYPE_1 else "parse_svg2"
+            yield f"{parser}/{name}", lambda: load_svg(rainbow_path)
+            yield f"build_state_hierarchy/{name}", lambda: build_state_hierarchy(
+                elements
+            )
+
+            load_svg(rainbow_path)
+            globals.transitions = transitions
+            globals.initial_state_key = initial_state_key
+            compile_transition_table(transitions, get_hierarchy())
+            start_configuration = get_state_model(
+                transitions, initial_state_key
+            ).initial
+            names = list(get_hierarchy()) + ["Outside"]
+            yield f"simulation/{name}", lambda: simulate_clicks(
+                start_configuration, names, SIMULATION_CLICKS, name
+            )
+
+        yield from analysis_benchmarks(name, transitions, initial_state_key)
+
+
+def write_synthetic_transitions(file_path, size, seed):
+    rng = random.Random(seed)
+    with open(file_path, "w") as file:
+        file.write("[*] -> s0\n")
+        for state in range(size):
+            file.write(f"s{state} -> s{(state + 1) % size} : next{state}\n")
+            for label in range(SYNTHETIC_DEGREE - 1):
+                file.write(f"s{state} -> s{rng.randrange(size)} : t{label}\n")
+
+
+def synthetic_elements(size, seed):
+    rng = random.Random(seed)
+    elements = []
+    regions = [(0.0, 10000.0, 0.0, 10000.0)]
+    while len(elements) < size:
+        x1, x2, y1, y2 = regions.pop(0)
+        width = (x2 - x1) / 2
+        height = (y2 - y1) / 2
+        for column in range(2):
+            for row in range(2):
+                margin = rng.uniform(0.05, 0.15)
+                box = (
+                    x1 + column * width + margin * width,
+                    x1 + (column + 1) * width - margin * width,
+                    y1 + row * height + margin * height,
+                    y1 + (row + 1) * height - margin * height,
+                )
+                elements.append((f"S{len(elements)}", box))
+                regions.append(box)
+    return elements[:size]
+
+
+def nested_elements(size):
+    return [(f"N{depth}", (-depth, depth, -depth, depth)) for depth in range(size)]
+
+
+def synthetic_benchmarks(directory):
+    for size in SYNTHETIC_SIZES:
+        name = f"synthetic_{size}"
+        transitions_path = os.path.join(directory, f"{name}_flattened.txt")
+        write_synthetic_transitions(transitions_path, size, size)
+        _, transitions, initial_state_key = load_transitions(transitions_path)
+
+        yield f"read_transitions/{name}", lambda: load_transitions(transitions_path)
+        yield from analysis_benchmarks(name, transitions, initial_state_key)
+
+    for size in HIERARCHY_SIZES:
+        elements = synthetic_elements(size, size)
+        nested = nested_elements(size)
+        yield f"build_state_hierarchy/synthetic_{size}", lambda: build_state_hierarchy(
+            elements
+        )
+        yield f"build_state_hierarchy/nested_{size}", lambda: build_state_hierarchy(
+            nested
+        )
+
+
+def run_benchmarks(examples_directory, repeat, synthetic, name_filter):
+    results = {}
+    with headless_dialogs(), tempfile.TemporaryDirectory() as synthetic_directory:
+        benchmarks = [example_benchmarks(examples_directory)]
+        if synthetic:
+            benchmarks.append(synthetic_benchmarks(synthetic_directory))
+
+        for group in benchmarks:
+            for name, function in group:
+                if name_filter and name_filter not in name:
+                    continue
+                results[name] = measure(function, repeat)
+                print(
+                    f"{name:<55} {results[name]['min_seconds'] * 1000:10.3f} ms "
+                    f"{results[name]['peak_bytes'] / 1024:10.1f} KiB",
+                    flush=True,
+                )
+    return results
+
+
+def compare_results(results, baseline):
+    regressions = []
+    for name, metrics in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = metrics["min_seconds"] / max(previous["min_seconds"], 1e-9)
+        if (
+            ratio > REGRESSION_THRESHOLD
+            and metrics["min_seconds"] - previous["min_seconds"]
+            > REGRESSION_MIN_SECONDS
+        ):
+            regressions.append((name, previous["min_seconds"], metrics["min_seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time parsing, simulation and analyses over example diagrams."
+    )
+    parser.add_argument(
+        "--examples",
+        default=os.path.join(os.path.dirname(__file__), "..", "examples"),
+        help="directory containing the example diagrams",
+    )
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT)
+    parser.add_argument("--filter", help="only run benchmarks containing this text")
+    parser.add_argument("--no-synthetic", action="store_true")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="compare against a saved JSON baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.examples, args.repeat, not args.no_synthetic, args.filter
+    )
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(
+                {"python": sys.version, "repeat": args.repeat, "results": results},
+                file,
+                indent=2,
+            )
+            file.write("\n")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare_results(results, baseline)
+        for name, previous, current in regressions:
+            print(
+                f"REGRESSION {name}: {previous * 1000:.3f} ms -> "
+                f"{current * 1000:.3f} ms"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
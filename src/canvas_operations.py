@@ -1,16 +1,27 @@
 import logging
-from tkinter import PhotoImage, messagebox
+from tkinter import messagebox
 
-import cairosvg
 import globals
 from config import (
     DEFAULT_SCALE_FACTOR,
     HIGHLIGHT_COLOR_ACTIVE,
     HIGHLIGHT_COLOR_HINTS,
     HIGHLIGHT_COLOR_OUTLINE,
+    HIGHLIGHT_COLOR_REACHABLE,
     HIGHLIGHT_COLOR_REMEMBERED,
 )
+from dialogs import show_popup
+from PIL import ImageTk
+from raster_cache import (
+    RENDER_WORKER,
+    cached_tile,
+    preview_tile,
+    quantize_scale,
+    tile_key,
+    visible_tiles,
+)
 from state_manager import state_parameter
+from state_model import get_state_model
 from svg_parser import (
     check_state_type1,
     check_state_type2,
@@ -18,12 +29,11 @@ from svg_parser import (
     get_elements,
     get_hierarchy,
 )
-from utilities import parse_state, show_popup, state_representation
+from utilities import parse_configuration
 
 
 def render_uml_diagram(canvas):
     ELEMENTS = get_elements()
-    STATE_HIERARCHY = get_hierarchy()
 
     if not globals.svg_file_path or not ELEMENTS:
         logging.error("No SVG file selected or no elements to display.")
@@ -31,18 +41,6 @@ def render_uml_diagram(canvas):
 
     modified_svg_content = globals.loaded_svg_content
 
-    target_width = globals.original_width * globals.current_scale
-    target_height = globals.original_height * globals.current_scale
-
-    target_width = max(target_width, globals.MIN_WIDTH)
-    target_height = max(target_height, globals.MIN_HEIGHT)
-
-    def split_states(state_list):
-        states = []
-        for state in state_list:
-            states.extend(state.split(","))
-        return states
-
     if modified_svg_content:
         if ELEMENTS and (
             globals.current_scale * max(ELEMENTS, key=lambda item: item[1][1])[1][1]
@@ -54,78 +52,171 @@ def render_uml_diagram(canvas):
             return
 
         if globals.is_svg_updated or globals.current_scale != globals.last_scale:
-            png_data = cairosvg.svg2png(
-                bytestring=globals.loaded_svg_content,
-                output_width=target_width,
-                output_height=target_height,
-            )
-            image = PhotoImage(data=png_data)
-            globals.current_image = image
-
-            canvas.delete("all")
-            canvas.create_image(0, 0, anchor="nw", image=image)
-            canvas.image = image
-
+            if globals.is_svg_updated:
+                create_overlay(canvas)
+            else:
+                place_overlay(canvas)
+            clear_tiles(canvas)
             globals.is_svg_updated = False
             globals.last_scale = globals.current_scale
-        else:
-            if globals.current_image is not None:
-                canvas.delete("all")
-                canvas.create_image(0, 0, anchor="nw", image=globals.current_image)
+
+            target_width, target_height = diagram_size()
+            canvas.config(width=target_width, height=target_height)
+            canvas.update_idletasks()
+            update_scrollregion(canvas)
+            load_visible_tiles(canvas)
+
+        clear_hints(canvas)
+        update_overlay(canvas)
+
+
+def overlay_coordinates(coordinates):
+    x1, x2, y1, y2 = [int(coord * globals.current_scale) for coord in coordinates]
+    return x1, y1, x2, y2
+
+
+def create_overlay(canvas):
+    canvas.delete("highlight")
+    globals.overlay_items = {}
+    globals.highlighted_states = {}
+
+    for state, coordinates in get_elements():
+        item = canvas.create_rectangle(
+            *overlay_coordinates(coordinates), state="hidden", tags="highlight"
+        )
+        globals.overlay_items.setdefault(state, []).append((item, coordinates))
+
+
+def place_overlay(canvas):
+    for items in globals.overlay_items.values():
+        for item, coordinates in items:
+            canvas.coords(item, *overlay_coordinates(coordinates))
+
+
+def highlight_styles():
+    STATE_HIERARCHY = get_hierarchy()
+    model = get_state_model(globals.transitions, globals.initial_state_key)
+    configuration = globals.current_configuration
+
+    if configuration is None:
+        active_leaves = remembered_leaves = []
+    else:
+        active_leaves = model.leaf_names(model.active_leaves[configuration])
+        remembered_leaves = model.leaf_names(model.remembered_leaves[configuration])
+    styles = {}
+
+    for active_state in active_leaves:
+        if globals.show_parent_highlight:
+            for state in find_active_states(active_state):
+                if state != active_state and state in STATE_HIERARCHY:
+                    styles.setdefault(state, (HIGHLIGHT_COLOR_OUTLINE, 2))
+        if active_state in STATE_HIERARCHY:
+            styles[active_state] = (HIGHLIGHT_COLOR_ACTIVE, 3)
+
+    for remembered_state in remembered_leaves:
+        styles[remembered_state] = (HIGHLIGHT_COLOR_REMEMBERED, 2)
+
+    return styles
+
+
+def update_overlay(canvas):
+    previous = globals.highlighted_states
+    styles = highlight_styles()
+
+    for state in previous.keys() | styles.keys():
+        style = styles.get(state)
+        if style == previous.get(state):
+            continue
+        for item, _ in globals.overlay_items.get(state, ()):
+            if style is None:
+                canvas.itemconfigure(item, state="hidden")
             else:
-                logging.error("No current image to render.")
+                outline, width = style
+                canvas.itemconfigure(item, state="normal", outline=outline, width=width)
 
-        if not ELEMENTS:
-            logging.info("No elements to highlight. Only Rendering the SVG")
-            return
+    globals.highlighted_states = styles
+
+
+def diagram_size():
+    return (
+        int(max(globals.original_width * globals.current_scale, globals.MIN_WIDTH)),
+        int(max(globals.original_height * globals.current_scale, globals.MIN_HEIGHT)),
+    )
 
-        current = state_representation(globals.current_state)
-        active_states, remembered_states = parse_state(current)
-
-        for active_state in split_states(active_states):
-            active_state = active_state.strip()
-            marked_states = find_active_states(active_state)
-            for state, hierarchy in STATE_HIERARCHY.items():
-                if state == active_state or (
-                    globals.show_parent_highlight and state in marked_states
-                ):
-                    for element in ELEMENTS:
-                        if element[0] == state:
-                            x1, x2, y1, y2 = [
-                                int(coord * globals.current_scale)
-                                for coord in element[1]
-                            ]
-
-                            outline_color = (
-                                HIGHLIGHT_COLOR_ACTIVE
-                                if state == active_state
-                                else HIGHLIGHT_COLOR_OUTLINE
-                            )
-
-                            outline_width = 2 if state != active_state else 3
-                            canvas.create_rectangle(
-                                x1,
-                                y1,
-                                x2,
-                                y2,
-                                outline=outline_color,
-                                width=outline_width,
-                            )
-
-        for remembered_state in split_states(remembered_states):
-            remembered_state = remembered_state.strip()
-            for element in ELEMENTS:
-                if element[0] == remembered_state:
-                    x1, x2, y1, y2 = [
-                        int(coord * globals.current_scale) for coord in element[1]
-                    ]
-                    canvas.create_rectangle(
-                        x1, y1, x2, y2, outline=HIGHLIGHT_COLOR_REMEMBERED, width=2
-                    )
-
-        canvas.config(width=target_width, height=target_height)
-        canvas.update_idletasks()
-        canvas.config(scrollregion=canvas.bbox("all"))
+
+def update_scrollregion(canvas):
+    width, height = diagram_size()
+    canvas.config(scrollregion=(0, 0, width, height))
+
+
+def clear_tiles(canvas):
+    canvas.delete("tile")
+    globals.displayed_tiles.clear()
+
+
+def show_tile(canvas, tile, box, raster, exact=True):
+    image = ImageTk.PhotoImage(raster)
+    if tile in globals.displayed_tiles:
+        item, _, _ = globals.displayed_tiles[tile]
+        canvas.itemconfigure(item, image=image)
+    else:
+        item = canvas.create_image(
+            box[0], box[1], anchor="nw", image=image, tags="tile"
+        )
+        canvas.tag_lower(item)
+    globals.displayed_tiles[tile] = (item, image, exact)
+
+
+def load_visible_tiles(canvas):
+    if not globals.loaded_svg_content or globals.original_width is None:
+        return
+
+    svg_content = globals.loaded_svg_content
+    width, height = diagram_size()
+    view_x = canvas.canvasx(0)
+    view_y = canvas.canvasy(0)
+    visible = dict(
+        visible_tiles(
+            width,
+            height,
+            (
+                view_x,
+                view_y,
+                view_x + canvas.winfo_width(),
+                view_y + canvas.winfo_height(),
+            ),
+        )
+    )
+
+    for tile in list(globals.displayed_tiles):
+        if tile not in visible:
+            item, _, _ = globals.displayed_tiles.pop(tile)
+            canvas.delete(item)
+
+    jobs = []
+    for tile, box in visible.items():
+        displayed = globals.displayed_tiles.get(tile)
+        if displayed is not None and displayed[2]:
+            continue
+
+        raster = cached_tile(svg_content, globals.current_scale, tile)
+        if raster is not None:
+            show_tile(canvas, tile, box, raster)
+            continue
+
+        key = tile_key(svg_content, globals.current_scale, tile)
+        jobs.append((key, svg_content, box, width, height))
+        if displayed is None:
+            preview = preview_tile(svg_content, globals.current_scale, box)
+            if preview is not None:
+                show_tile(canvas, tile, box, preview, exact=False)
+
+    RENDER_WORKER.request(canvas, jobs, lambda: load_visible_tiles(canvas))
+
+
+def on_scrollbar(canvas, view, *args):
+    view(*args)
+    load_visible_tiles(canvas)
 
 
 def on_canvas_click(
@@ -180,11 +271,10 @@ def enter_state(
         logging.info("No need to call render_uml_diagram")
 
 
-def highlight_next_states(canvas, next_states):
+def highlight_next_states(canvas, current, next_states, reachable_states=()):
     ELEMENTS = get_elements()
 
-    current = state_representation(globals.current_state)
-    active_current, _ = parse_state(current)
+    active_current, _ = parse_configuration(current)
 
     split_current_states = set()
     for state in active_current:
@@ -192,48 +282,79 @@ def highlight_next_states(canvas, next_states):
 
     active_states = set()
     for state in next_states:
-        active, _ = parse_state(state)
+        active, _ = parse_configuration(state)
         for individual_state in active:
             active_states.update(individual_state.split(","))
 
     if len(split_current_states) > 1 and current not in next_states:
         active_states = active_states - split_current_states
 
+    later_states = set(reachable_states) - active_states - split_current_states
+
     canvas.delete("hints")
 
     for state, coordinates in ELEMENTS:
         if state in active_states:
-            x1, x2, y1, y2 = [
-                int(coord * globals.current_scale) for coord in coordinates
-            ]
-            state_width = x2 - x1
-            state_height = y2 - y1
-            state_center_x = (x1 + x2) / 2
-            state_center_y = (y1 + y2) / 2
-
-            oval_half_width = state_width / 2
-            oval_half_height = state_height / 2
-
-            canvas.create_oval(
-                state_center_x - oval_half_width,
-                state_center_y - oval_half_height,
-                state_center_x + oval_half_width,
-                state_center_y + oval_half_height,
-                outline=HIGHLIGHT_COLOR_HINTS,
-                width=2,
-                tags="hints",
-            )
+            draw_hint(canvas, coordinates, HIGHLIGHT_COLOR_HINTS)
+        elif state in later_states:
+            draw_hint(canvas, coordinates, HIGHLIGHT_COLOR_REACHABLE, dash=(4, 4))
     if globals.hints_visible:
-        canvas.update_idletasks()
-        canvas.config(scrollregion=canvas.bbox("all"))
+        update_scrollregion(canvas)
+
+
+def draw_hint(canvas, coordinates, color, dash=None):
+    x1, x2, y1, y2 = [int(coord * globals.current_scale) for coord in coordinates]
+    state_width = x2 - x1
+    state_height = y2 - y1
+    state_center_x = (x1 + x2) / 2
+    state_center_y = (y1 + y2) / 2
+
+    oval_half_width = state_width / 2
+    oval_half_height = state_height / 2
+
+    canvas.create_oval(
+        state_center_x - oval_half_width,
+        state_center_y - oval_half_height,
+        state_center_x + oval_half_width,
+        state_center_y + oval_half_height,
+        outline=color,
+        width=2,
+        dash=dash,
+        tags="hints",
+    )
+
+
+def refresh_hints(canvas):
+    highlight_next_states(canvas, *current_hints())
+
+
+def current_hints():
+    model = get_state_model(globals.transitions, globals.initial_state_key)
+    configuration = globals.current_configuration
+    if configuration is None:
+        return "", [], set()
+
+    next_states = list(
+        dict.fromkeys(
+            model.configuration_name(next_state)
+            for next_state, _ in model.successors[configuration]
+        )
+    )
+    return (
+        model.configuration_name(configuration),
+        next_states,
+        set(model.reachable_leaf_names(configuration)),
+    )
 
 
 def zoom(event, canvas):
     if event.state & 0x4:
         ELEMENTS = get_elements()
-        scale_factor = DEFAULT_SCALE_FACTOR if event.delta > 0 else 0.9
+        zoom_factor = (
+            DEFAULT_SCALE_FACTOR if event.delta > 0 else 1 / DEFAULT_SCALE_FACTOR
+        )
 
-        new_scale = globals.current_scale * scale_factor
+        new_scale = quantize_scale(globals.current_scale * zoom_factor)
 
         if (
             new_scale * max(ELEMENTS, key=lambda item: item[1][1])[1][1]
@@ -245,22 +366,9 @@ def zoom(event, canvas):
             return
 
         globals.current_scale = new_scale
-        canvas.scale("all", event.x, event.y, scale_factor, scale_factor)
-
-        scroll_x1, scroll_y1, scroll_x2, scroll_y2 = canvas.bbox("all")
-        if (
-            scroll_x1 is not None
-            and scroll_y1 is not None
-            and scroll_x2 is not None
-            and scroll_y2 is not None
-        ):
-            canvas.config(scrollregion=(scroll_x1, scroll_y1, scroll_x2, scroll_y2))
-
         render_uml_diagram(canvas)
         if globals.hints_visible:
-            current = state_representation(globals.current_state)
-            next_states = globals.transitions.get(current, {}).keys()
-            highlight_next_states(canvas, next_states)
+            refresh_hints(canvas)
 
 
 def on_canvas_scroll(event, canvas):
@@ -275,6 +383,7 @@ def on_canvas_scroll(event, canvas):
             canvas.yview_scroll(-1, "units")
         elif event.delta < 0:
             canvas.yview_scroll(1, "units")
+    load_visible_tiles(canvas)
 
 
 def maximize_visible_canvas(canvas):
@@ -303,18 +412,19 @@ def maximize_visible_canvas(canvas):
     ):
         min_width_scale = globals.MIN_WIDTH / diagram_width
         min_height_scale = globals.MIN_HEIGHT / diagram_height
-        globals.current_scale = max(min_width_scale * 0.95, min_height_scale * 0.9)
+        globals.current_scale = quantize_scale(
+            max(min_width_scale * 0.95, min_height_scale * 0.9)
+        )
     else:
-        globals.current_scale = proposed_scale
+        globals.current_scale = quantize_scale(proposed_scale, round_down=True)
 
     render_uml_diagram(canvas)
 
     canvas.yview_moveto(0)
     canvas.xview_moveto(0)
+    load_visible_tiles(canvas)
     if globals.hints_visible:
-        current = state_representation(globals.current_state)
-        next_states = globals.transitions.get(current, {}).keys()
-        highlight_next_states(canvas, next_states)
+        refresh_hints(canvas)
 
 
 def clear_hints(canvas):
@@ -322,13 +432,12 @@ def clear_hints(canvas):
 
 
 def show_hints(canvas):
-    current_state_hints = state_representation(globals.current_state)
-    next_states = globals.transitions.get(current_state_hints, {}).keys()
+    current, next_states, reachable_states = current_hints()
 
     clear_hints(canvas)
 
     if next_states and not globals.hints_visible:
-        highlight_next_states(canvas, next_states)
+        highlight_next_states(canvas, current, next_states, reachable_states)
         globals.hints_visible = True
     elif not next_states:
         messagebox.showinfo("No More Steps", "No more further steps are possible.")
@@ -1,3 +1,5 @@
+import os
+
 SVG_NAMESPACE = "{http://www.w3.org/2000/svg}"
 DEFAULT_TEXT_COLOR = "#000000"
 XML_TYPE_1 = "Type1"
@@ -6,12 +8,36 @@ XML_TYPE_2 = "Type2"
 HIGHLIGHT_COLOR_ACTIVE = "turquoise"
 HIGHLIGHT_COLOR_REMEMBERED = "#AFEEEE"
 HIGHLIGHT_COLOR_HINTS = "orange"
+HIGHLIGHT_COLOR_REACHABLE = "#FFD27F"
 HIGHLIGHT_COLOR_OUTLINE = "red"
 FILE_TYPES = [("SVG files", "*.svg"), ("Text files", "*.txt")]
 DEFAULT_WINDOW_SIZE = "1280x720"
 DEFAULT_SCALE_FACTOR = 1.1
 DEFAULT_SCALE = 1.0
 MAX_SCALE_DIMENSION = 10000
+RASTER_CACHE_BUDGET = 256 * 1024 * 1024
+TILE_SIZE = 512
+RENDER_POLL_INTERVAL = 50
+
+MODEL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sd-simulate")
+MODEL_CACHE_VERSION = "1"
+MODEL_CACHE_ENTRIES = 64
+PARSE_CACHE_SIZE = 4096
+
+EXACT_NODE_ANALYSIS_LIMIT = 25
+NODE_ANALYSIS_BEAM_WIDTH = 2000
+NODE_ANALYSIS_SEARCH_LIMIT = 100000
+NODE_ANALYSIS_PROBE_LIMIT = 10000
+ANALYSIS_WORKERS = os.cpu_count() or 1
+PARALLEL_SPLIT_DEPTH = 3
+SHARED_BEST_INTERVAL = 1024
+TRANSPOSITION_TABLE_SIZE = 1000000
+LONGEST_PATH_SEARCH_LIMIT = 200000
+LONGEST_PATH_DISPLAY_LIMIT = 50
+ANALYSIS_TIME_BUDGET = 30
+ANALYSIS_POLL_INTERVAL = 100
+ANALYSIS_PROGRESS_INTERVAL = 5000
+ANALYSIS_START_METHOD = "spawn"
 
 APP_TITLE = "UML Diagram Viewer"
 APP_EXIT_MESSAGE = "Application is exiting..."
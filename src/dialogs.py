@@ -0,0 +1,104 @@
+import tkinter as tk
+
+import globals
+from config import RADIO_BUTTON_FONT
+
+
+class TransitionDialog(tk.Toplevel):
+    def __init__(self, parent, transitions_dict):
+        super().__init__(parent)
+        self.trans_value = tk.StringVar()
+        self.selected_option = None
+        self.user_made_choice = False
+
+        self.transient(parent)
+        self.grab_set()
+        sorted_transitions = dict(sorted(transitions_dict.items()))
+
+        if "" in sorted_transitions:
+            sorted_transitions[" "] = sorted_transitions[""]
+            del sorted_transitions[""]
+
+        if len(sorted_transitions) == 1:
+            self.selected_option = next(iter(sorted_transitions))
+            self.user_made_choice = True
+            self.destroy()
+            return
+
+        self.trans_value.set(next(iter(sorted_transitions)))
+
+        radio_button_font = RADIO_BUTTON_FONT
+
+        label = tk.Label(
+            self,
+            text="Select one of the following transitions:",
+            font=radio_button_font,
+        )
+        label.pack(pady=(10, 5), padx=25)
+
+        for key, label in sorted_transitions.items():
+            radio_button = tk.Radiobutton(
+                self,
+                text=key,
+                variable=self.trans_value,
+                value=key,
+                font=radio_button_font,
+            )
+            radio_button.pack(anchor=tk.W, pady=5, padx=50)
+
+        ok_button = tk.Button(
+            self, text="OK", command=self.on_ok, font=radio_button_font
+        )
+        ok_button.pack(padx=20, pady=(50, 10))
+
+        self.center_window()
+
+        self.wait_window(self)
+
+    def center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f"{width}x{height}+{x}+{y}")
+
+    def on_ok(self):
+        self.selected_option = self.trans_value.get()
+        self.user_made_choice = True
+        self.grab_release()
+        self.destroy()
+
+    def on_close(self):
+        self.grab_release()
+        self.destroy()
+
+
+def ask_user_for_transition(transitions_dict, parent):
+    dialog = TransitionDialog(parent, transitions_dict)
+    return dialog.selected_option
+
+
+def update_transition_display(transition_trace_label, reset_button, undo_button):
+    formatted_trace = [str(transition) for transition in globals.transition_trace]
+
+    transition_trace_label.config(state=tk.NORMAL)
+    transition_trace_label.delete("1.0", tk.END)
+    if formatted_trace:
+        transition_trace_label.insert(tk.END, ", ".join(formatted_trace) + ", ")
+    else:
+        transition_trace_label.insert(tk.END, "")
+    transition_trace_label.see(tk.END)
+    transition_trace_label.config(state=tk.DISABLED)
+    reset_button["state"] = "normal" if globals.transition_trace else "disabled"
+    undo_button["state"] = "normal" if globals.transition_trace else "disabled"
+
+
+def show_popup(message, x, y):
+    if globals.debug_mode:
+        popup = tk.Toplevel()
+        popup.title("Information")
+        label_coords = tk.Label(popup, text=f"Clicked Coordinates (x, y): ({x}, {y})")
+        label_state = tk.Label(popup, text=f"State: {message}")
+        label_coords.pack()
+        label_state.pack()
@@ -7,16 +7,20 @@ xml_type = None
 loaded_svg_content = None
 MIN_WIDTH = 1
 MIN_HEIGHT = 1
-MAXIMUM_RECURSION_DEPTH = 15
-current_image = None
+displayed_tiles: Dict[tuple, tuple] = {}
+overlay_items: Dict[str, list] = {}
+highlighted_states: Dict[str, tuple] = {}
 transition_trace: list[str] = []
 graph_states: list[str] = []
-state_stack: list[str] = []
+state_stack: list[int] = []
 is_svg_updated = False
 hints_visible = False
 current_state: Dict[str, List[str]] = {"active": [], "remembered": []}
+current_configuration = None
 initial_state_key = None
 transitions: Dict[str, List[str]] = {}
+state_model = None
+transition_table: Dict[int, Dict[str, dict]] = {}
 original_width = None
 original_height = None
 svg_file_path = None
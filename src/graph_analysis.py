@@ -1,30 +1,35 @@
-from tkinter import messagebox
+import logging
+from itertools import islice
 
 import globals
-
-current_best_node = []
-current_best_path = []
+from config import LONGEST_PATH_DISPLAY_LIMIT
+from longest_path import LongestPathSearch
+from state_model import get_state_model
+from transition_cover import find_max_transition_walk
+from walk_search import find_max_node_walk
 
 
 def perform_reachability_analysis(transitions, initial_state):
-    visited = set()
-    stack = [initial_state]
-
-    while stack:
-        state = stack.pop()
-        if state not in visited:
-            visited.add(state)
-            for next_state in transitions.get(state, {}):
-                stack.append(next_state)
+    model = get_state_model(transitions, initial_state)
+    reached = (
+        set()
+        if model.initial is None
+        else set(model.reachable_configurations(model.initial))
+    )
 
+    visited = {model.configuration_name(state) for state in reached}
     globals.graph_states = visited
-    unreachable_states = set(transitions.keys()) - visited
+    unreachable_states = {
+        model.configuration_name(state)
+        for state in model.source_ids
+        if model.initial is None or not model.is_reachable(model.initial, state)
+    }
     return visited, unreachable_states
 
 
 def on_reachability_analysis(transitions, initial_state_key, show_results):
     if initial_state_key is None:
-        messagebox.showerror("Error", "Initial state not set.")
+        show_results("Reachability Analysis:", "Initial state not set.")
         return
 
     reachable_states, unreachable_states = perform_reachability_analysis(
@@ -40,134 +45,98 @@ def on_reachability_analysis(transitions, initial_state_key, show_results):
         show_results("Reachability Analysis:", results)
 
 
-def decide_graph_analysis(mode, transitions, initial_state_key, show_results):
-    if len(globals.graph_states) <= 15:
-        perform_euler_hamilton_walk(mode, transitions, initial_state_key, show_results)
-    else:
-        messagebox.showinfo(
-            "UML Diagram has too many States",
-            "Performing longest Path analysis instead",
+def decide_graph_analysis(
+    mode, transitions, initial_state_key, show_results, progress=None
+):
+    if mode == "reachability":
+        on_reachability_analysis(transitions, initial_state_key, show_results)
+    elif mode == "node":
+        perform_max_node_analysis(
+            transitions, initial_state_key, show_results, progress
         )
-        if mode == "node":
-            perform_longest_path_analysis(transitions, initial_state_key, show_results)
-        else:
-            perform_max_transition_path_analysis(
-                transitions, initial_state_key, show_results
-            )
-
-
-def perform_euler_hamilton_walk(mode, transitions, initial_state_key, show_results):
-    global current_best_node
-    global current_best_path
-    current_best_node = []
-    current_best_path = []
-
-    def find_longest_paths(
-        current_state,
-        path,
-        visited,
-        recursion_depth,
-    ):
-        global current_best_node
-        global current_best_path
-        visited.append(current_state)
-
-        if mode == "node":
-            if len(set(visited)) > len(set(current_best_node)):
-                current_best_node = visited
-                current_best_path = path
-            elif len(set(visited)) == len(set(current_best_node)):
-                if len(path) < len(current_best_path):
-                    current_best_node = visited
-                    current_best_path = path
-        elif mode == "transition":
-            if len(set(path)) > len(set(current_best_path)):
-                current_best_node = visited
-                current_best_path = path
-            elif len(set(path)) == len(set(current_best_path)):
-                if len(path) < len(current_best_path):
-                    current_best_node = visited
-                    current_best_path = path
-
-        if recursion_depth < globals.MAXIMUM_RECURSION_DEPTH:
-            for next_state, labels in transitions.get(current_state, {}).items():
-                for label in labels:
-                    new_path = path + [(current_state, next_state, label)]
-                    find_longest_paths(
-                        next_state,
-                        new_path,
-                        visited.copy(),
-                        recursion_depth + 1,
-                    )
-
-    find_longest_paths(initial_state_key, [], [], 0)
-
-    transition_sequences = []
-    for path in current_best_path:
-        transition_sequences.append(path[2])
-
-    show_results(
-        "Maximum " + mode + " analysis:",
-        "\n" + " ".join(current_best_node) + "\n" + "->".join(transition_sequences),
-    )
+    elif mode == "longest":
+        perform_longest_path_analysis(transitions, initial_state_key, show_results)
+    else:
+        perform_max_transition_analysis(transitions, initial_state_key, show_results)
 
 
-def perform_longest_path_analysis(transitions, initial_state_key, show_results):
-    def find_longest_paths(current_state, path, visited):
-        visited.add(current_state)
-        paths = []
-        for next_state, labels in transitions.get(current_state, {}).items():
-            if next_state not in visited:
-                for label in labels:
-                    new_path = path + [(current_state, next_state, label)]
-                    paths.extend(
-                        find_longest_paths(next_state, new_path, visited.copy())
-                    )
-        return paths if paths else [path]
-
-    longest_paths = find_longest_paths(initial_state_key, [], set())
-    max_length = max(len(path) for path in longest_paths)
-    longest_paths = [path for path in longest_paths if len(path) == max_length]
-
-    transition_sequences = []
-    for path in longest_paths:
-        sequence = [f"{label}" for src, dest, label in path]
-        transition_sequences.append(sequence)
+def perform_max_node_analysis(
+    transitions, initial_state_key, show_results, progress=None
+):
+    model = get_state_model(transitions, initial_state_key)
+    if model.initial is None:
+        show_results("Maximum node analysis:", "Initial state not set.")
+        return
 
-    transition_sequences_str = [" -> ".join(seq) for seq in transition_sequences]
+    result = find_max_node_walk(model, progress)
+    logging.debug("Max node transposition table: %s", result["table_stats"])
 
-    results = "\n".join(transition_sequences_str)
-    show_results("Longest Path Analysis:", results)
+    transition_sequences = [label for _, _, label in result["path"]]
+    results = (
+        "\n"
+        + " ".join(model.configuration_name(state) for state in result["walk"])
+        + "\n"
+        + "->".join(transition_sequences)
+    )
+    if not result["exact"]:
+        method = "Heuristic search" if result["beam"] else "Partial search"
+        results += (
+            f"\n\n{method}: covers {result['coverage']} of at most "
+            f"{result['upper_bound']} states"
+        )
+    if globals.debug_mode:
+        stats = result["table_stats"]
+        results += (
+            f"\n\nTransposition table: {stats['size']} entries, "
+            f"{stats['hit_rate']:.1%} hit rate, {stats['evictions']} evictions"
+        )
+
+    show_results("Maximum node analysis:", results)
 
 
-def find_max_transition_path(transitions, current_state, path, visited_transitions):
-    max_path = path
-    for next_state, labels in transitions.get(current_state, {}).items():
-        for label in labels:
-            transition = (current_state, next_state, label)
-            if transition not in visited_transitions:
-                new_visited_transitions = visited_transitions | {transition}
-                new_path = path + [transition]
-                result_path = find_max_transition_path(
-                    transitions, next_state, new_path, new_visited_transitions
-                )
-                if len(result_path) > len(max_path):
-                    max_path = result_path
-            print(len(max_path))
-    return max_path
-
-
-def perform_max_transition_path_analysis(transitions, initial_state_key, show_results):
-    print("reached1")
-    max_transition_path = find_max_transition_path(
-        transitions, initial_state_key, [], set()
+def perform_max_transition_analysis(transitions, initial_state_key, show_results):
+    model = get_state_model(transitions, initial_state_key)
+    if model.initial is None:
+        show_results("Maximum transition analysis:", "Initial state not set.")
+        return
+
+    result = find_max_transition_walk(model)
+
+    walk = [model.initial] + [destination for _, destination, _ in result["path"]]
+    transition_sequences = [label for _, _, label in result["path"]]
+    results = (
+        "\n"
+        + " ".join(model.configuration_name(state) for state in walk)
+        + "\n"
+        + "->".join(transition_sequences)
+        + f"\n\nCovers {result['coverage']} of "
+        f"{result['transition_count']} transitions"
     )
 
-    if not max_transition_path:
-        results = "No path found that traverses every transition at least once."
-        show_results("Max Transition Path Analysis:", results)
+    show_results("Maximum transition analysis:", results)
+
+
+def perform_longest_path_analysis(transitions, initial_state_key, show_results):
+    model = get_state_model(transitions, initial_state_key)
+    if model.initial is None:
+        show_results("Longest Path Analysis:", "Initial state not set.")
         return
 
-    transition_sequence = [f"{label}" for src, dest, label in max_transition_path]
-    results = " -> ".join(transition_sequence)
-    show_results("Max Transition Path Analysis:", results)
+    search = LongestPathSearch(model)
+    longest_paths = islice(search.paths(), LONGEST_PATH_DISPLAY_LIMIT + 1)
+
+    transition_sequences_str = []
+    for path in longest_paths:
+        if len(transition_sequences_str) == LONGEST_PATH_DISPLAY_LIMIT:
+            transition_sequences_str.append("...")
+            break
+        sequence = [f"{label}" for src, dest, label in path]
+        transition_sequences_str.append(" -> ".join(sequence))
+
+    results = "\n".join(transition_sequences_str)
+    if not search.exact:
+        results += (
+            f"\n\nSearch limit reached: paths of length {search.length} "
+            "may not be the longest"
+        )
+    show_results("Longest Path Analysis:", results)
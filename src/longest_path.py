@@ -0,0 +1,182 @@
+from config import LONGEST_PATH_SEARCH_LIMIT
+
+
+class LongestPathSearch:
+    def __init__(self, model, search_limit=LONGEST_PATH_SEARCH_LIMIT):
+        self.model = model
+        self.components, self.component_of = model.strongly_connected_components()
+        self.search_limit = search_limit
+        self.expansions = 0
+        self.exact = True
+        self.longest_from = {}
+        self.exit_lengths = {}
+        self.exit_steps = {}
+        self.witnesses = {}
+        self.component_exits = {}
+        self.length = 0 if model.initial is None else self.solve(model.initial)
+
+    def within_budget(self):
+        self.expansions += 1
+        if self.expansions > self.search_limit:
+            self.exact = False
+            return False
+        return True
+
+    def solve(self, start):
+        reachable = self.model.reachable_from(start)
+        entries = {start}
+        for state in reachable:
+            for next_state, _ in self.model.successors[state]:
+                if self.component_of[next_state] != self.component_of[state]:
+                    entries.add(next_state)
+
+        for members in self.components:
+            for state in members:
+                if state in entries:
+                    self.longest(state)
+        return self.longest(start)
+
+    def internal_successors(self, state):
+        component = self.component_of[state]
+        successors = {}
+        for next_state, label in self.model.successors[state]:
+            if self.component_of[next_state] == component:
+                successors.setdefault(next_state, label)
+        return successors
+
+    def exit_length(self, state):
+        if state not in self.exit_lengths:
+            component = self.component_of[state]
+            self.exit_lengths[state] = 0
+            self.exit_steps[state] = None
+            for next_state, label in self.model.successors[state]:
+                if self.component_of[next_state] == component:
+                    continue
+                length = 1 + self.longest(next_state)
+                if length > self.exit_lengths[state]:
+                    self.exit_lengths[state] = length
+                    self.exit_steps[state] = (state, next_state, label)
+        return self.exit_lengths[state]
+
+    def component_exit(self, component):
+        if component not in self.component_exits:
+            self.component_exits[component] = max(
+                self.exit_length(state) for state in self.components[component]
+            )
+        return self.component_exits[component]
+
+    def longest(self, entry):
+        if entry in self.longest_from:
+            return self.longest_from[entry]
+
+        visited = {entry}
+        best = self.exit_length(entry)
+        witness = [entry]
+        frames = [iter(self.internal_successors(entry))]
+        states = [entry]
+
+        while frames:
+            next_state = next(frames[-1], None)
+            if next_state is None:
+                frames.pop()
+                visited.discard(states.pop())
+                continue
+            if next_state in visited or not self.within_budget():
+                continue
+
+            visited.add(next_state)
+            length = len(frames) + self.exit_length(next_state)
+            if length > best:
+                best = length
+                witness = states + [next_state]
+            frames.append(iter(self.internal_successors(next_state)))
+            states.append(next_state)
+
+        self.longest_from[entry] = best
+        self.witnesses[entry] = witness
+        return best
+
+    def witness_path(self):
+        path = []
+        entry = self.model.initial
+        while entry is not None:
+            states = self.witnesses[entry]
+            for state, next_state in zip(states, states[1:]):
+                label = self.internal_successors(state)[next_state]
+                path.append((state, next_state, label))
+
+            exit_step = self.exit_steps[states[-1]]
+            if exit_step is None:
+                break
+            path.append(exit_step)
+            entry = exit_step[1]
+        return path
+
+    def paths(self):
+        start = self.model.initial
+        if start is None:
+            return
+        if self.length == 0:
+            yield []
+            return
+
+        found = False
+        for path in self.enumerate_paths(start):
+            found = True
+            yield path
+        if not found:
+            yield self.witness_path()
+
+    def enumerate_paths(self, start):
+        path = []
+        expansions = 0
+        frames = [(start, self.length, {start}, iter(self.model.successors[start]))]
+
+        while frames:
+            state, remaining, visited, successors = frames[-1]
+            step = next(successors, None)
+            if step is None:
+                frames.pop()
+                if frames:
+                    if frames[-1][2] is visited:
+                        visited.discard(state)
+                    path.pop()
+                continue
+
+            next_state, label = step
+            component = self.component_of[next_state]
+            if component != self.component_of[state]:
+                if 1 + self.longest(next_state) != remaining:
+                    continue
+                next_visited = {next_state}
+            elif next_state in visited:
+                continue
+            elif (
+                len(self.components[component])
+                - len(visited)
+                - 1
+                + self.component_exit(component)
+                < remaining - 1
+            ):
+                continue
+            else:
+                expansions += 1
+                if expansions > self.search_limit:
+                    return
+                next_visited = visited
+
+            path.append((state, next_state, label))
+            if remaining == 1:
+                yield list(path)
+                path.pop()
+                continue
+
+            next_visited.add(next_state)
+            frames.append(
+                (
+                    next_state,
+                    remaining - 1,
+                    next_visited,
+                    iter(self.model.successors[next_state]),
+                )
+            )
@@ -4,11 +4,14 @@ import tkinter as tk
 from tkinter import Button, Canvas, Checkbutton, Entry, IntVar, Scrollbar, messagebox
 
 import globals
+from analysis_executor import AnalysisExecutor
 from canvas_operations import (
     enter_state,
+    load_visible_tiles,
     maximize_visible_canvas,
     on_canvas_click,
     on_canvas_scroll,
+    on_scrollbar,
     render_uml_diagram,
     show_hints,
     zoom,
@@ -25,11 +28,7 @@ from config import (
     TRANSITION_TRACE_FG,
     TRANSITION_TRACE_TITLE_BG,
 )
-from graph_analysis import (
-    decide_graph_analysis,
-    on_reachability_analysis,
-    perform_reachability_analysis,
-)
+from graph_analysis import perform_reachability_analysis
 from graph_visualization import show_state_diagram_graph
 from GUI import (
     choose_file,
@@ -55,6 +54,8 @@ hint_button = None
 reachability_button = None
 max_nodes_path = None
 max_transition_path = None
+longest_path_button = None
+cancel_analysis_button = None
 
 
 def run_app():
@@ -80,6 +81,7 @@ def run_app():
 
     def on_file_loaded():
         global current_transitions, initial_state_key
+        analysis_executor.cancel(discard=True)
         if choose_file(canvas, transition_trace_label, reset_button, undo_button):
             highlight_button["state"] = "normal"
             maximize_zoom_button["state"] = "normal"
@@ -87,9 +89,7 @@ def run_app():
             reset_button["state"] = "disabled"
             undo_button["state"] = "disabled"
             button_show_graph["state"] = "normal"
-            reachability_button["state"] = "normal"
-            max_nodes_path["state"] = "normal"
-            max_transition_path["state"] = "normal"
+            set_analysis_running(analysis_executor.running)
 
             current_transitions = globals.transitions
             initial_state_key = globals.initial_state_key
@@ -180,6 +180,18 @@ def run_app():
                 globals.analysis_results_visible = False
         globals.full_content = new_content
 
+    def set_analysis_running(running):
+        analysis_state = "disabled" if running else "normal"
+        reachability_button["state"] = analysis_state
+        max_nodes_path["state"] = analysis_state
+        max_transition_path["state"] = analysis_state
+        longest_path_button["state"] = analysis_state
+        cancel_analysis_button["state"] = "normal" if running else "disabled"
+
+    analysis_executor = AnalysisExecutor(
+        app, show_analysis_results, set_analysis_running
+    )
+
     canvas: Canvas = tk.Canvas(canvas_frame, bg=CANVAS_BG)
     canvas.grid(row=0, column=0, sticky="nsew")
 
@@ -246,8 +258,8 @@ def run_app():
         left_button_frame,
         text="Reachability Analysis",
         state="disabled",
-        command=lambda: on_reachability_analysis(
-            current_transitions, initial_state_key, show_analysis_results
+        command=lambda: analysis_executor.submit(
+            "reachability", current_transitions, initial_state_key
         ),
     )
 
@@ -255,8 +267,8 @@ def run_app():
         left_button_frame,
         text="Max Nodes Analysis",
         state="disabled",
-        command=lambda: decide_graph_analysis(
-            "node", current_transitions, initial_state_key, show_analysis_results
+        command=lambda: analysis_executor.submit(
+            "node", current_transitions, initial_state_key
         ),
     )
 
@@ -264,28 +276,52 @@ def run_app():
         left_button_frame,
         text="Max transitions Analysis",
         state="disabled",
-        command=lambda: decide_graph_analysis(
-            "transition", current_transitions, initial_state_key, show_analysis_results
+        command=lambda: analysis_executor.submit(
+            "transition", current_transitions, initial_state_key
         ),
     )
 
+    longest_path_button = tk.Button(
+        left_button_frame,
+        text="Longest Path Analysis",
+        state="disabled",
+        command=lambda: analysis_executor.submit(
+            "longest", current_transitions, initial_state_key
+        ),
+    )
+
+    cancel_analysis_button = tk.Button(
+        left_button_frame,
+        text="Cancel",
+        state="disabled",
+        command=analysis_executor.cancel,
+    )
+
     load_button.pack(side=tk.LEFT, padx=(5, 25))
     state_name_entry.pack(side=tk.LEFT, padx=(0, 5))
     highlight_button.pack(side=tk.LEFT, padx=(0, 40))
     button_show_graph.pack(side=tk.LEFT, padx=(0, 5))
     reachability_button.pack(side=tk.LEFT, padx=(0, 5))
     max_nodes_path.pack(side=tk.LEFT, padx=(0, 5))
-    max_transition_path.pack(side=tk.LEFT, padx=(0, 40))
+    max_transition_path.pack(side=tk.LEFT, padx=(0, 5))
+    longest_path_button.pack(side=tk.LEFT, padx=(0, 5))
+    cancel_analysis_button.pack(side=tk.LEFT, padx=(0, 40))
     maximize_zoom_button.pack(side=tk.LEFT, padx=(0, 15))
 
     vertical_scroll_bar: Scrollbar = tk.Scrollbar(
-        canvas_frame, orient=tk.VERTICAL, command=canvas.yview, bg=SCROLLBAR_BG
+        canvas_frame,
+        orient=tk.VERTICAL,
+        command=lambda *args: on_scrollbar(canvas, canvas.yview, *args),
+        bg=SCROLLBAR_BG,
     )
     vertical_scroll_bar.grid(row=0, column=1, sticky="ns")
     canvas.configure(yscrollcommand=vertical_scroll_bar.set)
 
     horizontal_scroll_bar: Scrollbar = tk.Scrollbar(
-        canvas_frame, orient=tk.HORIZONTAL, command=canvas.xview, bg=SCROLLBAR_BG
+        canvas_frame,
+        orient=tk.HORIZONTAL,
+        command=lambda *args: on_scrollbar(canvas, canvas.xview, *args),
+        bg=SCROLLBAR_BG,
     )
     horizontal_scroll_bar.grid(row=1, column=0, sticky="ew")
     canvas.configure(xscrollcommand=horizontal_scroll_bar.set)
@@ -294,6 +330,7 @@ def run_app():
     canvas_frame.grid_columnconfigure(0, weight=1)
 
     canvas.bind("<Configure>", update_text_width())
+    canvas.bind("<Configure>", lambda event: load_visible_tiles(canvas), add="+")
     canvas.bind("<Control-MouseWheel>", lambda event: zoom(event, canvas))
     canvas.bind("<Control-Button-4>", lambda event: zoom(event, canvas))
     canvas.bind("<Control-Button-5>", lambda event: zoom(event, canvas))
@@ -316,6 +353,7 @@ def run_app():
     def on_close():
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
             logging.info(APP_EXIT_MESSAGE)
+            analysis_executor.shutdown()
             app.quit()
             app.destroy()
 
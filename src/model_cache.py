@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+
+import globals
+from config import MODEL_CACHE_DIR, MODEL_CACHE_ENTRIES, MODEL_CACHE_VERSION
+from svg_parser import load_svg, set_elements
+from utilities import read_transitions_from_file
+
+
+def model_cache_key(*file_paths):
+    digest = hashlib.sha256(MODEL_CACHE_VERSION.encode())
+    for file_path in file_paths:
+        file_digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 16), b""):
+                file_digest.update(chunk)
+        digest.update(file_digest.digest())
+    return digest.hexdigest()
+
+
+def model_cache_path(cache_key):
+    return os.path.join(MODEL_CACHE_DIR, f"{cache_key}.json")
+
+
+def read_cached_model(cache_path):
+    try:
+        with open(cache_path, "r") as cache_file:
+            model = json.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.error("Ignoring unreadable model cache %s: %s", cache_path, str(e))
+        return None
+
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return model
+
+
+def write_cached_model(cache_path, model):
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temporary_path, "w") as cache_file:
+            json.dump(model, cache_file, separators=(",", ":"))
+        os.replace(temporary_path, cache_path)
+    except OSError as e:
+        logging.error("Could not write model cache %s: %s", cache_path, str(e))
+        try:
+            os.unlink(temporary_path)
+        except OSError:
+            pass
+        return
+
+    evict_cached_models(os.path.dirname(cache_path))
+
+
+def evict_cached_models(cache_dir, keep=MODEL_CACHE_ENTRIES):
+    entries = []
+    try:
+        with os.scandir(cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith(".json"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+    except OSError as e:
+        logging.error("Could not scan model cache %s: %s", cache_dir, str(e))
+        return
+
+    entries.sort(reverse=True)
+    for _, path in entries[keep:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def load_diagram_model(svg_file_path, svg_rainbow_file_path, transitions_file_path):
+    cache_path = model_cache_path(
+        model_cache_key(svg_file_path, svg_rainbow_file_path, transitions_file_path)
+    )
+    model = read_cached_model(cache_path)
+
+    if model is None:
+        xml_type, elements, hierarchy, dimensions = load_svg(svg_rainbow_file_path)
+        current_state, transitions = read_transitions_from_file(transitions_file_path)
+        model = {
+            "xml_type": xml_type,
+            "elements": elements,
+            "hierarchy": hierarchy,
+            "dimensions": dimensions,
+            "current_state": current_state,
+            "transitions": transitions,
+            "initial_state_key": globals.initial_state_key,
+        }
+        write_cached_model(cache_path, model)
+        return model
+
+    logging.info("Loaded diagram model from cache %s", cache_path)
+    model["elements"] = [
+        (state, tuple(coordinates)) for state, coordinates in model["elements"]
+    ]
+    if model["dimensions"] is not None:
+        model["dimensions"] = tuple(model["dimensions"])
+    set_elements(model["elements"], model["hierarchy"])
+    globals.transitions = model["transitions"]
+    globals.initial_state_key = model["initial_state_key"]
+    globals.current_state = model["current_state"]
+    return model
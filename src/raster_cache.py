@@ -0,0 +1,266 @@
+import copy
+import io
+import logging
+import math
+import queue
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from cairosvg.parser import Tree
+from cairosvg.surface import PNGSurface
+from config import (
+    DEFAULT_SCALE_FACTOR,
+    RASTER_CACHE_BUDGET,
+    RENDER_POLL_INTERVAL,
+    TILE_SIZE,
+)
+from PIL import Image
+
+RENDER_DPI = 96
+
+
+class RasterCache:
+    def __init__(self, budget=RASTER_CACHE_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        image = self.entries.get(key)
+        if image is not None:
+            self.entries.move_to_end(key)
+        return image
+
+    def put(self, key, image):
+        if key in self.entries:
+            self.size -= image_size(self.entries.pop(key))
+        self.entries[key] = image
+        self.size += image_size(image)
+
+        while self.size > self.budget and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= image_size(evicted)
+
+    def levels(self, content_key):
+        return {key[1] for key in self.entries if key[0] == content_key}
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class RenderWorker:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.jobs = []
+        self.results = queue.Queue()
+        self.requested = set()
+        self.thread = None
+        self.polling = False
+        self.on_rendered = None
+
+    def request(self, widget, jobs, on_rendered):
+        keys = {job[0] for job in jobs}
+        self.on_rendered = on_rendered
+        if keys == self.requested:
+            return
+
+        with self.condition:
+            self.jobs = list(jobs)
+            self.condition.notify()
+        self.requested = keys
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        if keys and not self.polling:
+            self.polling = True
+            widget.after(RENDER_POLL_INTERVAL, self.poll, widget)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.jobs:
+                    self.condition.wait()
+                key, svg_content, box, width, height = self.jobs.pop(0)
+
+            try:
+                raster = render_tile(svg_content, box, width, height)
+            except Exception as e:
+                logging.error("Error rendering tile %s: %s", key[2:], str(e))
+                raster = None
+            self.results.put((key, raster))
+
+    def poll(self, widget):
+        rendered = False
+        while True:
+            try:
+                key, raster = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.requested.discard(key)
+            if raster is not None:
+                RASTER_CACHE.put(key, raster)
+                rendered = True
+
+        if rendered:
+            self.on_rendered()
+        if self.requested:
+            widget.after(RENDER_POLL_INTERVAL, self.poll, widget)
+        else:
+            self.polling = False
+
+
+RASTER_CACHE = RasterCache()
+RENDER_WORKER = RenderWorker()
+
+
+def image_size(image):
+    return image.width * image.height * len(image.getbands())
+
+
+def zoom_level(scale):
+    return round(math.log(scale, DEFAULT_SCALE_FACTOR))
+
+
+def level_scale(level):
+    return DEFAULT_SCALE_FACTOR**level
+
+
+def quantize_scale(scale, round_down=False):
+    level = math.log(scale, DEFAULT_SCALE_FACTOR)
+    return level_scale(math.floor(level + 1e-9) if round_down else round(level))
+
+
+def tile_range(start, end, limit):
+    return range(
+        max(int(start) // TILE_SIZE, 0), math.ceil(min(end, limit) / TILE_SIZE)
+    )
+
+
+def visible_tiles(width, height, view):
+    x1, y1, x2, y2 = view
+    for tile_y in tile_range(y1, y2, height):
+        for tile_x in tile_range(x1, x2, width):
+            yield (tile_x, tile_y), (
+                tile_x * TILE_SIZE,
+                tile_y * TILE_SIZE,
+                min((tile_x + 1) * TILE_SIZE, width),
+                min((tile_y + 1) * TILE_SIZE, height),
+            )
+
+
+@lru_cache(maxsize=4)
+def parsed_svg(svg_content):
+    tree = Tree(bytestring=svg_content)
+
+    if "viewBox" in tree:
+        view_box = [float(v) for v in re.split(r"[\s,]+", tree["viewBox"].strip())]
+    else:
+        view_box = [
+            0.0,
+            0.0,
+            float(re.sub(r"[^\d.]", "", tree["width"])),
+            float(re.sub(r"[^\d.]", "", tree["height"])),
+        ]
+    return tree, view_box
+
+
+def clone_tree(tree):
+    # cairosvg rewrites pattern, mask and text nodes while drawing, so every
+    # tile draws its own copy of the nodes instead of the shared parse.
+    root = copy.copy(tree)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        node.children = [copy.copy(child) for child in node.children]
+        for child in node.children:
+            child.parent = node
+            stack.append(child)
+    return root
+
+
+def render_tile(svg_content, box, width, height):
+    tree, (view_x, view_y, view_width, view_height) = parsed_svg(svg_content)
+    x1, y1, x2, y2 = box
+    unit_x = view_width / width
+    unit_y = view_height / height
+
+    tile_tree = clone_tree(tree)
+    tile_tree["width"] = str(x2 - x1)
+    tile_tree["height"] = str(y2 - y1)
+    tile_tree["viewBox"] = (
+        f"{view_x + x1 * unit_x} {view_y + y1 * unit_y} "
+        f"{(x2 - x1) * unit_x} {(y2 - y1) * unit_y}"
+    )
+    tile_tree["preserveAspectRatio"] = "none"
+
+    png_data = io.BytesIO()
+    PNGSurface(
+        tile_tree,
+        png_data,
+        RENDER_DPI,
+        output_width=x2 - x1,
+        output_height=y2 - y1,
+    ).finish()
+
+    image = Image.open(io.BytesIO(png_data.getvalue()))
+    image.load()
+    return image
+
+
+def tile_key(svg_content, scale, tile):
+    return (hash(svg_content), zoom_level(scale)) + tile
+
+
+def cached_tile(svg_content, scale, tile):
+    return RASTER_CACHE.get(tile_key(svg_content, scale, tile))
+
+
+def tile_mosaic(content_key, level, tiles_x, tiles_y):
+    mosaic = Image.new("RGBA", (len(tiles_x) * TILE_SIZE, len(tiles_y) * TILE_SIZE))
+    for tile_y in tiles_y:
+        for tile_x in tiles_x:
+            raster = RASTER_CACHE.get((content_key, level, tile_x, tile_y))
+            if raster is None:
+                return None
+            mosaic.paste(
+                raster,
+                (
+                    (tile_x - tiles_x.start) * TILE_SIZE,
+                    (tile_y - tiles_y.start) * TILE_SIZE,
+                ),
+            )
+    return mosaic
+
+
+def preview_tile(svg_content, scale, box):
+    content_key = hash(svg_content)
+    level = zoom_level(scale)
+    x1, y1, x2, y2 = box
+
+    for cached_level in sorted(
+        RASTER_CACHE.levels(content_key) - {level},
+        key=lambda cached: abs(cached - level),
+    ):
+        factor = level_scale(cached_level) / level_scale(level)
+        tiles_x = tile_range(x1 * factor, x2 * factor, math.inf)
+        tiles_y = tile_range(y1 * factor, y2 * factor, math.inf)
+        mosaic = tile_mosaic(content_key, cached_level, tiles_x, tiles_y)
+        if mosaic is None:
+            continue
+
+        origin_x = tiles_x.start * TILE_SIZE
+        origin_y = tiles_y.start * TILE_SIZE
+        return mosaic.resize(
+            (max(x2 - x1, 1), max(y2 - y1, 1)),
+            box=(
+                x1 * factor - origin_x,
+                y1 * factor - origin_y,
+                x2 * factor - origin_x,
+                y2 * factor - origin_y,
+            ),
+        )
+    return None
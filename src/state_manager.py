@@ -2,256 +2,80 @@ import logging
 from tkinter import messagebox
 
 import globals
+from dialogs import ask_user_for_transition, update_transition_display
+from state_model import get_state_model
 from svg_parser import get_hierarchy
-from utilities import (
-    ask_user_for_transition,
-    file_state_representation,
-    parse_state,
-    state_representation,
-    update_transition_display,
-)
-
-
-def read_transitions_from_file(file_path):
-    globals.transitions = {}
-    transition_counter = {}
-
-    def add_transition(source, dest, label):
-        source_key = file_state_representation(source)
-        dest_key = file_state_representation(dest)
-
-        if source_key not in globals.transitions:
-            globals.transitions[source_key] = {}
-
-        if dest_key not in globals.transitions[source_key]:
-            globals.transitions[source_key][dest_key] = {label: "Option 1"}
-        else:
-            counter = transition_counter.get((source_key, dest_key), 1) + 1
-            transition_counter[(source_key, dest_key)] = counter
-            globals.transitions[source_key][dest_key][label] = f"Option {counter}"
-
-    with open(file_path, "r") as file:
-        for line in file.readlines():
-            line = line.strip()
-
-            if line.startswith("[*] -> "):
-                state_str = line[6:].strip()
-                active, remembered = parse_state(state_str)
-                globals.current_state["active"] = active
-                globals.current_state["remembered"] = remembered
-                globals.initial_state_key = file_state_representation(state_str)
-                globals.transitions[globals.initial_state_key] = {}
-            elif "->" in line:
-                parts = line.split("->")
-                source_str = parts[0].strip()
-                dest_and_label = parts[1].strip()
-                dest_str, label = map(str.strip, dest_and_label.split(":"))
-                add_transition(source_str, dest_str, label)
-
-    return globals.current_state, globals.transitions
+from utilities import parse_configuration, parse_state, state_representation
 
 
 def state_parameter(state, transition_trace_label, reset_button, undo_button, parent):
-    current_active_formatted = ",".join(globals.current_state["active"])
-    current_remembered_formatted = (
-        ",".join(globals.current_state["remembered"])
-        if globals.current_state["remembered"]
-        else None
+    globals.hints_visible = False
+    return state_handling(
+        state, transition_trace_label, reset_button, undo_button, parent
     )
 
-    if current_remembered_formatted:
-        combined_transition_state = (
-            f"{state}({current_active_formatted},{current_remembered_formatted})"
-        )
-    else:
-        combined_transition_state = state
-
-    available_transitions = globals.transitions.get(combined_transition_state, {})
-
-    if globals.current_state["remembered"] == []:
-        combined_transition_state = f"{state}({globals.current_state['active']})"
-
-        if combined_transition_state in available_transitions:
-            globals.hints_visible = False
-            state_transitioned = state_handling(
-                combined_transition_state,
-                transition_trace_label,
-                reset_button,
-                undo_button,
-                parent,
-            )
-        else:
-            globals.hints_visible = False
-            state_transitioned = state_handling(
-                state,
-                transition_trace_label,
-                reset_button,
-                undo_button,
-                parent,
-            )
-    else:
-        combined_transition_state = f"{state}({globals.current_state['remembered']})"
-        current = state_representation(globals.current_state)
-
-        if combined_transition_state in globals.transitions.get(current, {}):
-            globals.hints_visible = False
-            state_transitioned = state_handling(
-                combined_transition_state,
-                transition_trace_label,
-                reset_button,
-                undo_button,
-                parent,
-            )
-        else:
-            globals.hints_visible = False
-            state_transitioned = state_handling(
-                state,
-                transition_trace_label,
-                reset_button,
-                undo_button,
-                parent,
-            )
-
-    return state_transitioned
-
-
-def state_select(
-    state_condition,
-    active_current,
-    transition_trace_label,
-    reset_button,
-    undo_button,
-    parent,
-):
-    state_changed = False
-
-    if len(state_condition) == 1:
-        chosen_transition = list(state_condition.items())[0][0]
 
-    else:
-        chosen_transition = ask_user_for_transition(state_condition, parent)
+def resolve_clicked_state(state, current, transitions):
+    active_current, remembered_current = parse_state(current)
 
-    if chosen_transition is not None:
-        globals.state_stack.append(globals.current_state.copy())
-        next_state = state_condition[chosen_transition]
-        active, new_remembered = parse_state(next_state)
-        if active != active_current:
-            state_changed = True
-        globals.current_state["active"] = active
-        globals.current_state["remembered"] = new_remembered
-        globals.transition_trace.append(chosen_transition)
-        update_transition_display(transition_trace_label, reset_button, undo_button)
-    return state_changed
+    if remembered_current == []:
+        combined_transition_state = f"{state}({active_current})"
+        if combined_transition_state in transitions.get(state, {}):
+            return combined_transition_state
+    else:
+        combined_transition_state = f"{state}({remembered_current})"
+        if combined_transition_state in transitions.get(current, {}):
+            return combined_transition_state
 
+    return state
 
-def state_handling(state, transition_trace_label, reset_button, undo_button, parent):
-    STATE_HIERARCHY = get_hierarchy()
 
-    state_changed = False
+def simulated_configuration(state, split_active=False):
+    active, remembered = parse_state(state)
+    if split_active and active and "," in active[0]:
+        active = active[0].split(",")
+    return state_representation({"active": active, "remembered": remembered})
 
-    def collect_all_children(state_name, hierarchy):
-        if state_name == "Outside":
-            top_level_states = set(hierarchy.keys())
-            for state, children in hierarchy.items():
-                top_level_states.difference_update(children)
-            return list(top_level_states)
 
-        all_children = []
-        children = hierarchy.get(state_name, [])
-        for child in children:
-            all_children.append(child)
-            all_children.extend(collect_all_children(child, hierarchy))
+def collect_all_children(state_name, hierarchy):
+    if state_name == "Outside":
+        top_level_states = set(hierarchy.keys())
+        for state, children in hierarchy.items():
+            top_level_states.difference_update(children)
+        return list(top_level_states)
 
-        for element in all_children:
-            if hierarchy.get(element):
-                all_children.remove(element)
+    all_children = []
+    children = hierarchy.get(state_name, [])
+    for child in children:
+        all_children.append(child)
+        all_children.extend(collect_all_children(child, hierarchy))
 
-        return list(set(all_children))
+    for element in all_children:
+        if hierarchy.get(element):
+            all_children.remove(element)
 
-    def is_part_of_combined_state(clicked_state, allowed_transitions):
-        relevant_combined_states = []
-        for transition_state in allowed_transitions:
-            active_transition_states, _ = parse_state(transition_state)
-            for active_state in active_transition_states:
-                individual_states = active_state.split(",")
-                if clicked_state in individual_states:
-                    relevant_combined_states.append(transition_state)
-        return relevant_combined_states
+    return list(set(all_children))
 
-    current = state_representation(globals.current_state)
 
-    active_clicked, remembered_clicked = parse_state(state)
-    active_current, remembered_current = parse_state(current)
+def is_part_of_combined_state(clicked_state, allowed_transitions):
+    relevant_combined_states = []
+    for transition_state in allowed_transitions:
+        active_transition_states, _ = parse_configuration(transition_state)
+        for active_state in active_transition_states:
+            individual_states = active_state.split(",")
+            if clicked_state in individual_states:
+                relevant_combined_states.append(transition_state)
+    return relevant_combined_states
 
-    children = collect_all_children(state, STATE_HIERARCHY)
 
-    allowed_transitions = globals.transitions.get(current, {})
-    combined_states = is_part_of_combined_state(state, allowed_transitions)
+def compile_click_targets(state, children, allowed_transitions, hierarchy):
+    click_targets = {
+        "combined_states": is_part_of_combined_state(state, allowed_transitions),
+        "children_options": None,
+        "outside_options": {},
+    }
 
-    if combined_states:
-        chosen_transition = None
-        transition_to_combined_state_map = {}
-
-        if len(combined_states) > 1:
-            for combined_state in combined_states:
-                for transition_option in globals.transitions[current][combined_state]:
-                    transition_to_combined_state_map[transition_option] = combined_state
-            chosen_transition = ask_user_for_transition(
-                transition_to_combined_state_map, parent
-            )
-        else:
-            combined_state = combined_states[0]
-            if isinstance(combined_state, list):
-                combined_state = combined_state[0]
-            if isinstance(globals.transitions[current][combined_state], dict):
-                chosen_transition = ask_user_for_transition(
-                    globals.transitions[current][combined_state], parent
-                )
-            else:
-                chosen_transition = globals.transitions[current][combined_state]
-
-        if chosen_transition is not None:
-            target_combined_state = transition_to_combined_state_map.get(
-                chosen_transition, combined_state
-            )
-            globals.state_stack.append(globals.current_state.copy())
-            active_next, remembered_next = parse_state(target_combined_state)
-            if "," in active_next[0]:
-                active_next = active_next[0].split(",")
-            globals.current_state["active"] = active_next
-            globals.current_state["remembered"] = remembered_next
-            globals.transition_trace.append(chosen_transition)
-            update_transition_display(transition_trace_label, reset_button, undo_button)
-            state_changed = True
-            return state_changed
-        else:
-            return
-
-    if state in allowed_transitions:
-        if isinstance(allowed_transitions[state], dict):
-            chosen_transition = ask_user_for_transition(
-                allowed_transitions[state], parent
-            )
-        else:
-            chosen_transition = allowed_transitions[state]
-
-        if chosen_transition is not None:
-            globals.state_stack.append(globals.current_state.copy())
-            if active_clicked != active_current:
-                state_changed = True
-            globals.current_state["active"] = active_clicked
-            globals.current_state["remembered"] = remembered_clicked
-            globals.transition_trace.append(chosen_transition)
-            update_transition_display(transition_trace_label, reset_button, undo_button)
-    elif state in allowed_transitions:
-        globals.state_stack.append(globals.current_state.copy())
-        if active_clicked != active_current:
-            state_changed = True
-        globals.current_state["active"] = active_clicked
-        globals.current_state["remembered"] = remembered_clicked
-        globals.transition_trace.append(allowed_transitions[state])
-        update_transition_display(transition_trace_label, reset_button, undo_button)
-    elif state in STATE_HIERARCHY and children != []:
+    if state in hierarchy and children != []:
         allowed_transitions_from_children = {}
 
         for child in children:
@@ -267,45 +91,123 @@ def state_handling(state, transition_trace_label, reset_button, undo_button, par
                     else:
                         allowed_transitions_from_children[transitions] = child
 
-        if allowed_transitions_from_children:
-            state_changed = state_select(
-                allowed_transitions_from_children,
-                active_current,
-                transition_trace_label,
-                reset_button,
-                undo_button,
-                parent,
-            )
-
-    elif state == "Outside":
-        outside_children = collect_all_children("Outside", STATE_HIERARCHY)
-
-        allowed_transitions_from_outside = {}
-
-        for top_level_state in outside_children:
-            for target_state, transitions in globals.transitions.get(
-                current, {}
-            ).items():
-                if isinstance(transitions, dict):
-                    for option, transition_label in transitions.items():
-                        allowed_transitions_from_outside[option] = target_state
-                else:
-                    allowed_transitions_from_outside[transitions] = target_state
-
-        if allowed_transitions_from_outside:
-            state_changed = state_select(
-                allowed_transitions_from_outside,
-                active_current,
-                transition_trace_label,
-                reset_button,
-                undo_button,
-                parent,
-            )
+        click_targets["children_options"] = allowed_transitions_from_children
+
+    elif state == "Outside" and children:
+        for target_state, transitions in allowed_transitions.items():
+            if isinstance(transitions, dict):
+                for option, transition_label in transitions.items():
+                    click_targets["outside_options"][option] = target_state
+            else:
+                click_targets["outside_options"][transitions] = target_state
+
+    return click_targets
+
+
+def compile_click(model, configuration, state, children_by_state, transitions):
+    hierarchy = get_hierarchy()
+    current = "" if configuration is None else model.configuration_name(configuration)
+    allowed_transitions = transitions.get(current, {})
+    state = resolve_clicked_state(state, current, transitions)
+    children = children_by_state.get(state)
+    if children is None:
+        children = collect_all_children(state, hierarchy)
+    click_targets = compile_click_targets(
+        state, children, allowed_transitions, hierarchy
+    )
+
+    active_current, _ = parse_state(current)
+    click = {"choices": {}, "ask": True, "default": None, "changes": {}, "error": None}
+
+    def add_choice(label, target, split_active=False):
+        target_id = model.intern_configuration(
+            simulated_configuration(target, split_active)
+        )
+        click["choices"][label] = target_id
+        click["changes"][target_id] = (
+            split_active or parse_state(target)[0] != active_current
+        )
+        click["default"] = target_id
+
+    combined_states = click_targets["combined_states"]
+    if combined_states:
+        for combined_state in combined_states:
+            for label in allowed_transitions[combined_state]:
+                add_choice(label, combined_state, split_active=True)
+    elif state in allowed_transitions:
+        for label in allowed_transitions[state]:
+            add_choice(label, state)
+    elif click_targets["children_options"] is not None or state == "Outside":
+        options = click_targets["children_options"]
+        if options is None:
+            options = click_targets["outside_options"]
+        for label, target in options.items():
+            add_choice(label, target)
+        click["ask"] = len(options) > 1
     else:
-        logging.error(f"No valid transitions found from {current} to {active_clicked}")
-        messagebox.showinfo(
-            "Invalid Transition",
+        click["error"] = (
+            f"No valid transitions found from {current} to {parse_state(state)[0]}",
             f"Cannot transition from {current} to (within) {state}",
         )
 
-    return state_changed
+    return click
+
+
+def compile_transition_table(transitions, hierarchy):
+    model = get_state_model(transitions, globals.initial_state_key)
+    children_by_state = {
+        state: collect_all_children(state, hierarchy)
+        for state in list(hierarchy) + ["Outside"]
+    }
+    globals.transition_table = {
+        source: {
+            state: compile_click(model, source, state, children_by_state, transitions)
+            for state in children_by_state
+        }
+        for source in model.source_ids
+    }
+    return globals.transition_table
+
+
+def get_click_targets(configuration, state):
+    source_targets = globals.transition_table.setdefault(configuration, {})
+    click = source_targets.get(state)
+
+    if click is None:
+        click = compile_click(
+            get_state_model(globals.transitions, globals.initial_state_key),
+            configuration,
+            state,
+            {},
+            globals.transitions,
+        )
+        source_targets[state] = click
+
+    return click
+
+
+def state_handling(state, transition_trace_label, reset_button, undo_button, parent):
+    click = get_click_targets(globals.current_configuration, state)
+
+    if click["error"] is not None:
+        log_message, info_message = click["error"]
+        logging.error(log_message)
+        messagebox.showinfo("Invalid Transition", info_message)
+        return False
+
+    choices = click["choices"]
+    if not choices:
+        return False
+    if click["ask"]:
+        chosen_transition = ask_user_for_transition(choices, parent)
+    else:
+        chosen_transition = next(iter(choices))
+    if chosen_transition is None:
+        return False
+
+    next_configuration = choices.get(chosen_transition, click["default"])
+    globals.state_stack.append(globals.current_configuration)
+    globals.current_configuration = next_configuration
+    globals.transition_trace.append(chosen_transition)
+    update_transition_display(transition_trace_label, reset_button, undo_button)
+    return click["changes"][next_configuration]
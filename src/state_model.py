@@ -0,0 +1,220 @@
+import globals
+from utilities import parse_configuration
+
+
+class StateModel:
+    def __init__(self, transitions, initial_state_key):
+        self.transitions = transitions
+        self.initial_state_key = initial_state_key
+        self.configuration_ids = {}
+        self.configurations = []
+        self.leaf_ids = {}
+        self.leaves = []
+        self.active_leaves = []
+        self.remembered_leaves = []
+        self.successors = []
+        self.components = None
+        self.component_of = None
+        self.closure = None
+        self.leaf_closure = None
+
+        for source in transitions:
+            self.intern_configuration(source)
+        self.source_ids = range(len(self.configurations))
+
+        for source, destinations in transitions.items():
+            source_id = self.configuration_ids[source]
+            for destination, labels in destinations.items():
+                destination_id = self.intern_configuration(destination)
+                for label in labels:
+                    self.successors[source_id].append((destination_id, label))
+
+        self.initial = (
+            None
+            if initial_state_key is None
+            else self.intern_configuration(initial_state_key)
+        )
+
+    def intern_configuration(self, configuration):
+        configuration_id = self.configuration_ids.get(configuration)
+        if configuration_id is not None:
+            return configuration_id
+
+        configuration_id = len(self.configurations)
+        self.configuration_ids[configuration] = configuration_id
+        self.components = None
+        self.component_of = None
+        self.closure = None
+        self.leaf_closure = None
+        self.configurations.append(configuration)
+        self.successors.append([])
+
+        active, remembered = parse_configuration(configuration)
+        self.active_leaves.append(self.intern_leaves(active))
+        self.remembered_leaves.append(self.intern_leaves(remembered))
+        return configuration_id
+
+    def intern_leaves(self, states):
+        leaf_ids = []
+        for state in states:
+            for leaf in state.split(","):
+                leaf = leaf.strip()
+                if leaf not in self.leaf_ids:
+                    self.leaf_ids[leaf] = len(self.leaves)
+                    self.leaves.append(leaf)
+                leaf_ids.append(self.leaf_ids[leaf])
+        return tuple(leaf_ids)
+
+    def strongly_connected_components(self):
+        if self.components is not None:
+            return self.components, self.component_of
+
+        count = len(self.configurations)
+        index = [None] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack = []
+        components = []
+        component_of = [None] * count
+        counter = 0
+
+        for root in range(count):
+            if index[root] is not None:
+                continue
+            work = [(root, 0)]
+            while work:
+                state, position = work.pop()
+                if position == 0:
+                    index[state] = low[state] = counter
+                    counter += 1
+                    stack.append(state)
+                    on_stack[state] = True
+
+                successors = self.successors[state]
+                descended = False
+                while position < len(successors):
+                    next_state = successors[position][0]
+                    position += 1
+                    if index[next_state] is None:
+                        work.append((state, position))
+                        work.append((next_state, 0))
+                        descended = True
+                        break
+                    if on_stack[next_state]:
+                        low[state] = min(low[state], index[next_state])
+                if descended:
+                    continue
+
+                if low[state] == index[state]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component_of[member] = len(components)
+                        component.append(member)
+                        if member == state:
+                            break
+                    components.append(component)
+
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[state])
+
+        self.components = components
+        self.component_of = component_of
+        return components, component_of
+
+    def component_successors(self):
+        components, component_of = self.strongly_connected_components()
+        successors = [set() for _ in components]
+        for state, transitions in enumerate(self.successors):
+            for next_state, _ in transitions:
+                if component_of[state] != component_of[next_state]:
+                    successors[component_of[state]].add(component_of[next_state])
+        return successors
+
+    def reachability_closure(self):
+        if self.closure is not None:
+            return self.closure
+
+        components, component_of = self.strongly_connected_components()
+        component_successors = self.component_successors()
+        component_closure = [0] * len(components)
+        for component, members in enumerate(components):
+            closure = 0
+            for member in members:
+                closure |= 1 << member
+            for successor in component_successors[component]:
+                closure |= component_closure[successor]
+            component_closure[component] = closure
+
+        self.closure = [component_closure[component] for component in component_of]
+        return self.closure
+
+    def reachable_leaf_closure(self):
+        if self.leaf_closure is not None:
+            return self.leaf_closure
+
+        components, component_of = self.strongly_connected_components()
+        component_successors = self.component_successors()
+        component_closure = [0] * len(components)
+        for component, members in enumerate(components):
+            closure = 0
+            for member in members:
+                for leaf_id in self.active_leaves[member]:
+                    closure |= 1 << leaf_id
+            for successor in component_successors[component]:
+                closure |= component_closure[successor]
+            component_closure[component] = closure
+
+        self.leaf_closure = [component_closure[component] for component in component_of]
+        return self.leaf_closure
+
+    def is_reachable(self, source, target):
+        return bool((self.reachability_closure()[source] >> target) & 1)
+
+    def reachable_configurations(self, state):
+        return bitset_members(self.reachability_closure()[state])
+
+    def reachable_leaf_names(self, state):
+        return self.leaf_names(bitset_members(self.reachable_leaf_closure()[state]))
+
+    def reachable_from(self, state):
+        reached = {state}
+        stack = [state]
+        while stack:
+            for next_state, _ in self.successors[stack.pop()]:
+                if next_state not in reached:
+                    reached.add(next_state)
+                    stack.append(next_state)
+        return reached
+
+    def configuration_id(self, configuration):
+        return self.configuration_ids.get(configuration)
+
+    def configuration_name(self, configuration_id):
+        return self.configurations[configuration_id]
+
+    def leaf_names(self, leaf_ids):
+        return [self.leaves[leaf_id] for leaf_id in leaf_ids]
+
+
+def bitset_members(bitset):
+    members = []
+    while bitset:
+        lowest = bitset & -bitset
+        members.append(lowest.bit_length() - 1)
+        bitset ^= lowest
+    return members
+
+
+def get_state_model(transitions, initial_state_key):
+    model = globals.state_model
+    if (
+        model is None
+        or model.transitions is not transitions
+        or model.initial_state_key != initial_state_key
+    ):
+        model = StateModel(transitions, initial_state_key)
+        globals.state_model = model
+    return model
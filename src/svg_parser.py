@@ -1,134 +1,181 @@
 import logging
+import math
+import re
 import xml.etree.ElementTree as ET
-from typing import Dict, List
+from bisect import bisect_left, bisect_right
+from typing import Dict, FrozenSet, List
 
 from config import DEFAULT_TEXT_COLOR, SVG_NAMESPACE, XML_TYPE_1, XML_TYPE_2
-from utilities import svg_path_to_coords
+from utilities import get_svg_root_dimensions, svg_path_to_coords
 
 ELEMENTS = []
 STATE_HIERARCHY: Dict[str, List[str]] = {}
+STATE_PARENTS: Dict[str, str] = {}
+STATE_PARENTS_OF: Dict[str, List[str]] = {}
+STATE_ANCESTORS: Dict[str, FrozenSet[str]] = {}
+SPATIAL_INDEX = None
+ADJACENT_BOX_SCAN = 4
+STROKE_STYLE_PATTERN = re.compile(r"stroke:([^;]*);")
+
+
+def collect_svg_geometry(file_path):
+    geometry = {
+        "has_id": False,
+        "dimensions": None,
+        "texts": [],
+        "rect_by_stroke": {},
+        "ellipse_bounds": [],
+        "groups": [],
+    }
+    open_elements = []
+    open_groups = []
+
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            if not open_elements:
+                geometry["dimensions"] = get_svg_root_dimensions(element.attrib)
+            elif element.tag == f"{SVG_NAMESPACE}g":
+                if element.get("id") is not None:
+                    geometry["has_id"] = True
+                open_groups.append(
+                    {
+                        "index": len(geometry["groups"]) + len(open_groups),
+                        "stroke": element.get("stroke"),
+                        "fill": element.get("fill"),
+                        "path": None,
+                        "text": None,
+                    }
+                )
+            open_elements.append(element)
+            continue
+
+        open_elements.pop()
+
+        if element.tag == f"{SVG_NAMESPACE}text":
+            geometry["texts"].append((element.get("fill"), element.text))
+            for group in open_groups:
+                if group["text"] is None:
+                    group["text"] = element.text or ""
+        elif element.tag == f"{SVG_NAMESPACE}path":
+            for group in open_groups:
+                if group["path"] is None:
+                    group["path"] = element.get("d", "")
+        elif element.tag == f"{SVG_NAMESPACE}rect":
+            rect_bounds = tuple(
+                float(element.get(attribute, 0))
+                for attribute in ("x", "y", "width", "height")
+            )
+            for stroke_color in STROKE_STYLE_PATTERN.findall(element.get("style", "")):
+                geometry["rect_by_stroke"].setdefault(stroke_color, rect_bounds)
+        elif element.tag == f"{SVG_NAMESPACE}ellipse":
+            cx, cy = float(element.get("cx")), float(element.get("cy"))
+            rx, ry = float(element.get("rx")), float(element.get("ry"))
+            geometry["ellipse_bounds"].append((cx - rx, cx + rx, cy - ry, cy + ry))
+        elif element.tag == f"{SVG_NAMESPACE}g":
+            geometry["groups"].append(open_groups.pop())
+
+        if open_elements:
+            open_elements[-1].remove(element)
+
+    geometry["groups"].sort(key=lambda group: group["index"])
+    return geometry
+
 
+def load_svg(file_path):
+    geometry = collect_svg_geometry(file_path)
 
-def identify_xml_type(root):
-    g_elements = root.findall(f".//{SVG_NAMESPACE}g")
-    has_id = any(g.get("id") is not None for g in g_elements)
-    if has_id:
-        return XML_TYPE_1
+    if geometry["has_id"]:
+        xml_type = XML_TYPE_1
+        build_type1_elements(geometry)
     else:
-        return XML_TYPE_2
+        xml_type = XML_TYPE_2
+        build_type2_elements(geometry)
+
+    return xml_type, ELEMENTS, STATE_HIERARCHY, geometry["dimensions"]
 
 
 def parse_svg(file_path):
-    global ELEMENTS, STATE_HIERARCHY
-    tree = ET.parse(file_path)
-    root = tree.getroot()
+    return build_type1_elements(collect_svg_geometry(file_path))
+
+
+def build_type1_elements(geometry):
     result_list = []
-    text_elements = root.findall(".//{http://www.w3.org/2000/svg}text")
-    rect_elements = root.findall(".//{http://www.w3.org/2000/svg}rect")
-    ellipse_elements = root.findall(".//{http://www.w3.org/2000/svg}ellipse")
-
-    for text_element in text_elements:
-        text_fill_color = text_element.get("fill")
-        if text_fill_color != DEFAULT_TEXT_COLOR:
-            matching_rect = None
-            for rect_element in rect_elements:
-                rect_stroke_match = rect_element.get("style")
-                if f"stroke:{text_fill_color};" in rect_stroke_match:
-                    matching_rect = rect_element
-                    break
-            if matching_rect is not None:
-                state_name = text_element.text.strip()
-                rect_x = float(matching_rect.get("x"))
-                rect_y = float(matching_rect.get("y"))
-                rect_width = float(matching_rect.get("width"))
-                rect_height = float(matching_rect.get("height"))
-                x1 = rect_x
-                x2 = rect_x + rect_width
-                y1 = rect_y
-                y2 = rect_y + rect_height
-                result_list.append((state_name, (x1, x2, y1, y2)))
-
-    for i in range(len(ellipse_elements)):
-        outer_ellipse = ellipse_elements[i]
-        for j in range(len(ellipse_elements)):
-            if i == j:
-                continue
 
-            inner_ellipse = ellipse_elements[j]
-            outer_cx, outer_cy = float(outer_ellipse.get("cx")), float(
-                outer_ellipse.get("cy")
-            )
-            outer_rx, outer_ry = float(outer_ellipse.get("rx")), float(
-                outer_ellipse.get("ry")
-            )
+    for text_fill_color, text in geometry["texts"]:
+        if text_fill_color == DEFAULT_TEXT_COLOR or not text:
+            continue
+        matching_rect = geometry["rect_by_stroke"].get(text_fill_color)
+        if matching_rect is not None:
+            state_name = text.strip()
+            rect_x, rect_y, rect_width, rect_height = matching_rect
+            x1 = rect_x
+            x2 = rect_x + rect_width
+            y1 = rect_y
+            y2 = rect_y + rect_height
+            result_list.append((state_name, (x1, x2, y1, y2)))
+
+    for end_state_bounds in find_enclosing_ellipses(geometry["ellipse_bounds"]):
+        result_list.append(("[**]", end_state_bounds))
+
+    result_list.sort(key=lambda x: x[1][0])
+    set_elements(result_list, build_state_hierarchy(result_list))
 
-            inner_cx, inner_cy = float(inner_ellipse.get("cx")), float(
-                inner_ellipse.get("cy")
-            )
-            inner_rx, inner_ry = float(inner_ellipse.get("rx")), float(
-                inner_ellipse.get("ry")
-            )
+    return ELEMENTS, STATE_HIERARCHY
 
+
+def find_enclosing_ellipses(ellipse_bounds):
+    by_left_edge = sorted(range(len(ellipse_bounds)), key=lambda i: ellipse_bounds[i])
+    left_edges = [ellipse_bounds[i][0] for i in by_left_edge]
+    enclosing = []
+
+    for i, (outer_x1, outer_x2, outer_y1, outer_y2) in enumerate(ellipse_bounds):
+        start = bisect_left(left_edges, outer_x1)
+        for position in range(start, len(by_left_edge)):
+            j = by_left_edge[position]
+            inner_x1, inner_x2, inner_y1, inner_y2 = ellipse_bounds[j]
+            if inner_x1 > outer_x2:
+                break
             if (
-                outer_cx - outer_rx <= inner_cx - inner_rx
-                and outer_cx + outer_rx >= inner_cx + inner_rx
-                and outer_cy - outer_ry <= inner_cy - inner_ry
-                and outer_cy + outer_ry >= inner_cy + inner_ry
+                i != j
+                and outer_x2 >= inner_x2
+                and outer_y1 <= inner_y1
+                and outer_y2 >= inner_y2
             ):
-                end_state_bounds = (
-                    outer_cx - outer_rx,
-                    outer_cx + outer_rx,
-                    outer_cy - outer_ry,
-                    outer_cy + outer_ry,
-                )
-                result_list.append(("[**]", end_state_bounds))
+                enclosing.append((outer_x1, outer_x2, outer_y1, outer_y2))
                 break
 
-    result_list.sort(key=lambda x: (len(STATE_HIERARCHY.get(x[0], [])), x[1][0]))
-    STATE_HIERARCHY.update(build_state_hierarchy(result_list))
+    return enclosing
 
-    ELEMENTS = result_list
 
-    return ELEMENTS, STATE_HIERARCHY
+def parse_svg2(file_path):
+    return build_type2_elements(collect_svg_geometry(file_path))
 
 
-def parse_svg2(file_path):
-    global ELEMENTS, STATE_HIERARCHY
-    tree = ET.parse(file_path)
-    root = tree.getroot()
+def build_type2_elements(geometry):
     result_list = []
-    colored_list = []
-    text_list = []
-    end_state = None
     end_state_color = None
-
-    group_elements = root.findall(".//{http://www.w3.org/2000/svg}g")
-
-    for group_element in group_elements:
-        group_fill_color = group_element.get("fill")
-        if group_fill_color != "rgb(0,0,0)":
-            colored_list.append(group_fill_color)
-        else:
+    state_groups = []
+    last_path_by_stroke = {}
+    first_path_by_stroke = {}
+
+    for group in geometry["groups"]:
+        path_stroke_color = group["stroke"]
+        if path_stroke_color is not None:
+            first_path_by_stroke.setdefault(path_stroke_color, group["path"])
+            if group["path"] is not None:
+                last_path_by_stroke[path_stroke_color] = group["path"]
+
+        group_fill_color = group["fill"]
+        if group_fill_color == "rgb(0,0,0)":
             continue
 
-        text_element = group_element.find(".//{http://www.w3.org/2000/svg}text")
-
-        if text_element is not None:
-            if text_element.text:
-                text_list.append(text_element.text)
-                state_name = text_element.text.strip()
-        else:
+        if group["text"] is None:
             end_state_color = group_fill_color
-            continue
-
-        related_path = None
-        for path_element in root.findall(".//{http://www.w3.org/2000/svg}g"):
-            path_stroke_color = path_element.get("stroke")
-            if path_stroke_color is not None:
-                path = path_element.find(".//{http://www.w3.org/2000/svg}path")
-                if path_stroke_color == group_fill_color:
-                    related_path = path.get("d")
+        elif group["text"]:
+            state_groups.append((group["text"].strip(), group_fill_color))
 
+    for state_name, group_fill_color in state_groups:
+        related_path = last_path_by_stroke.get(group_fill_color)
         if related_path:
             coordinates = svg_path_to_coords(related_path)
             if coordinates:
@@ -136,93 +183,217 @@ def parse_svg2(file_path):
         else:
             logging.error(f"No matching path found for state: {state_name}")
 
-    for group_element in group_elements:
-        path_stroke_color = group_element.get("stroke")
-        if path_stroke_color == end_state_color and path_stroke_color != "rgb(0,0,0)":
-            path = group_element.find(".//{http://www.w3.org/2000/svg}path")
-            if path is not None:
-                end_state = path.get("d")
-                coordinates = svg_path_to_coords(end_state)
-                if coordinates:
-                    result_list.append(("[**]", coordinates))
-            break
-
-    global STATE_HIERARCHY
-    STATE_HIERARCHY = build_state_hierarchy(result_list)
+    if end_state_color is not None and end_state_color != "rgb(0,0,0)":
+        end_state = first_path_by_stroke.get(end_state_color)
+        if end_state is not None:
+            coordinates = svg_path_to_coords(end_state)
+            if coordinates:
+                result_list.append(("[**]", coordinates))
 
     if not result_list:
         logging.error("The selected SVG doesn't contain the expected elements.")
 
-    ELEMENTS = result_list
+    set_elements(result_list, build_state_hierarchy(result_list))
 
     return ELEMENTS, STATE_HIERARCHY
 
 
 def build_state_hierarchy(states):
     hierarchy = {state: [] for state, _ in states}
+    if not states:
+        return hierarchy
 
     states = sorted(states, key=lambda x: (x[1][1] - x[1][0]) * (x[1][3] - x[1][2]))
+    boxes = [coords for _, coords in states]
+    index = None
 
     for i, (child_state, child_coords) in enumerate(states):
-        for j in range(i + 1, len(states)):
-            parent_state, parent_coords = states[j]
-            if (
-                parent_coords[0] <= child_coords[0]
-                and parent_coords[1] >= child_coords[1]
-                and parent_coords[2] <= child_coords[2]
-                and parent_coords[3] >= child_coords[3]
-            ):
-                hierarchy[parent_state].append(child_state)
+        parent = None
+        for j in range(i + 1, min(i + 1 + ADJACENT_BOX_SCAN, len(boxes))):
+            if box_contains(boxes[j], child_coords):
+                parent = j
                 break
+        else:
+            if i + 1 + ADJACENT_BOX_SCAN < len(boxes):
+                if index is None:
+                    index = build_box_index(boxes)
+                parent = first_containing_box(index, boxes, child_coords, i)
+
+        if parent is not None:
+            hierarchy[states[parent][0]].append(child_state)
 
     return hierarchy
 
 
-def check_state_type1(x, y):
-    for element in reversed(ELEMENTS):
-        x1, x2, y1, y2 = element[1]
-        if x1 <= x <= x2 and y1 <= y <= y2:
-            return element[0]
-    return "Outside"
-
-
-def check_state_type2(x, y, state=None, state_hierarchy=None):
-    if state is None:
-        state = "Outside"
-    if state_hierarchy is None:
-        state_hierarchy = []
-
-    for element in ELEMENTS:
-        x1, x2, y1, y2 = element[1]
-        if x1 <= x <= x2 and y1 <= y <= y2:
-            state = element[0]
+def build_box_index(boxes):
+    sizes = [max(x2 - x1, y2 - y1) for x1, x2, y1, y2 in boxes]
+    base = min((size for size in sizes if size > 0), default=1.0)
+    cells = {}
+
+    for position, ((x1, _, y1, _), size) in enumerate(zip(boxes, sizes)):
+        level = box_level(base, size)
+        cell_size = base * 2**level
+        level_cells = cells.setdefault(level, {})
+        level_cells.setdefault((int(x1 // cell_size), int(y1 // cell_size)), []).append(
+            position
+        )
+
+    return {
+        "base": base,
+        "levels": [
+            (
+                level,
+                base * 2**level,
+                cells[level],
+                min(candidates[0] for candidates in cells[level].values()),
+            )
+            for level in sorted(cells)
+        ],
+    }
+
+
+def box_level(base, size):
+    level = max(math.ceil(math.log2(size / base)), 0) if size > base else 0
+    while base * 2**level < size:
+        level += 1
+    return level
+
+
+def first_containing_box(index, boxes, coords, after=-1):
+    x1, x2, y1, y2 = coords
+    min_level = box_level(index["base"], max(x2 - x1, y2 - y1))
+    best = None
+
+    for level, cell_size, cells, first_position in index["levels"]:
+        if level < min_level or (best is not None and first_position >= best):
+            continue
+        cell_x = int(x1 // cell_size)
+        cell_y = int(y1 // cell_size)
+        for key in (
+            (cell_x, cell_y),
+            (cell_x - 1, cell_y),
+            (cell_x, cell_y - 1),
+            (cell_x - 1, cell_y - 1),
+        ):
+            candidates = cells.get(key)
+            if not candidates:
+                continue
+            for k in range(bisect_right(candidates, after), len(candidates)):
+                position = candidates[k]
+                if best is not None and position >= best:
+                    break
+                if box_contains(boxes[position], coords):
+                    best = position
+                    break
+
+    return best
+
+
+def box_contains(outer, inner):
+    return (
+        outer[0] <= inner[0]
+        and outer[1] >= inner[1]
+        and outer[2] <= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def build_spatial_index(elements):
+    if not elements:
+        return None
+
+    by_area = sorted(
+        range(len(elements)),
+        key=lambda i: (
+            (elements[i][1][1] - elements[i][1][0])
+            * (elements[i][1][3] - elements[i][1][2]),
+            -i,
+        ),
+    )
+    boxes = [elements[i][1] for i in by_area]
+
+    return {
+        "states": [elements[i][0] for i in by_area],
+        "boxes": boxes,
+        "index": build_box_index(boxes),
+    }
+
+
+def build_parent_map(hierarchy):
+    parents = {}
+    for parent_state, child_states in hierarchy.items():
+        for child_state in child_states:
+            if child_state != parent_state:
+                parents.setdefault(child_state, parent_state)
+    return parents
+
+
+def find_innermost_state(x, y):
+    if SPATIAL_INDEX is None:
+        return "Outside"
+
+    position = first_containing_box(
+        SPATIAL_INDEX["index"], SPATIAL_INDEX["boxes"], (x, x, y, y)
+    )
+    if position is None:
+        return "Outside"
+    return SPATIAL_INDEX["states"][position]
+
+
+def get_ancestor_chain(state):
+    chain = [state]
+    while chain[-1] in STATE_PARENTS:
+        parent_state = STATE_PARENTS[chain[-1]]
+        if parent_state in chain:
             break
+        chain.append(parent_state)
+    chain.reverse()
+    return chain
+
 
-    if state not in state_hierarchy:
-        state_hierarchy.append(state)
-        parent_states = STATE_HIERARCHY.get(state, [])
-        for parent_state in parent_states:
-            check_state_type2(x, y, parent_state, state_hierarchy)
+def check_state_type1(x, y):
+    return find_innermost_state(x, y)
 
-    return state_hierarchy
 
+def check_state_type2(x, y):
+    return get_ancestor_chain(find_innermost_state(x, y))
 
-def find_active_states(state, visited=None):
-    if visited is None:
-        visited = set()
 
-    if state in visited:
-        return set()
+def build_parents_of(hierarchy):
+    parents_of = {}
+    for parent_state, child_states in hierarchy.items():
+        for child_state in child_states:
+            parents_of.setdefault(child_state, []).append(parent_state)
+    return parents_of
 
-    visited.add(state)
-    marked_states = {state}
 
-    for parent_state, child_states in STATE_HIERARCHY.items():
-        if state in child_states:
-            marked_states.add(parent_state)
-            marked_states.update(find_active_states(parent_state, visited))
+def find_active_states(state):
+    ancestors = STATE_ANCESTORS.get(state)
+    if ancestors is not None:
+        return ancestors
 
-    return marked_states
+    marked_states = {state}
+    stack = [state]
+    while stack:
+        for parent_state in STATE_PARENTS_OF.get(stack.pop(), []):
+            if parent_state not in marked_states:
+                marked_states.add(parent_state)
+                stack.append(parent_state)
+
+    ancestors = frozenset(marked_states)
+    STATE_ANCESTORS[state] = ancestors
+    return ancestors
+
+
+def set_elements(elements, hierarchy):
+    global ELEMENTS, STATE_HIERARCHY, STATE_PARENTS, SPATIAL_INDEX
+    global STATE_PARENTS_OF, STATE_ANCESTORS
+    ELEMENTS = elements
+    STATE_HIERARCHY = hierarchy
+    STATE_PARENTS = build_parent_map(hierarchy)
+    STATE_PARENTS_OF = build_parents_of(hierarchy)
+    STATE_ANCESTORS = {}
+    SPATIAL_INDEX = build_spatial_index(elements)
 
 
 def get_elements():
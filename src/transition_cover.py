@@ -0,0 +1,209 @@
+from collections import deque
+
+
+def find_max_transition_walk(model):
+    start = model.initial
+    components, component_of = model.strongly_connected_components()
+    internal = [[] for _ in components]
+    outgoing = [[] for _ in components]
+
+    for source, transitions in enumerate(model.successors):
+        for destination, label in transitions:
+            transition = (source, destination, label)
+            if component_of[source] == component_of[destination]:
+                internal[component_of[source]].append(transition)
+            else:
+                outgoing[component_of[source]].append(transition)
+
+    coverage = [0] * len(components)
+    for component in range(len(components)):
+        coverage[component] = len(internal[component]) + max(
+            (
+                1 + coverage[component_of[destination]]
+                for _, destination, _ in outgoing[component]
+            ),
+            default=0,
+        )
+
+    component_walks = {}
+
+    def cover(component, entry, exit):
+        key = (component, entry, exit)
+        if key not in component_walks:
+            component_walks[key] = cover_component(internal[component], entry, exit)
+        return component_walks[key]
+
+    def best_exits(component):
+        remaining = coverage[component] - len(internal[component])
+        return [
+            transition
+            for transition in outgoing[component]
+            if remaining and 1 + coverage[component_of[transition[1]]] == remaining
+        ]
+
+    entries = {(component_of[start], start)}
+    pending = list(entries)
+    while pending:
+        component, _ = pending.pop()
+        for _, destination, _ in best_exits(component):
+            entry = (component_of[destination], destination)
+            if entry not in entries:
+                entries.add(entry)
+                pending.append(entry)
+
+    best_walks = {}
+    for component, entry in sorted(entries):
+        exits = best_exits(component)
+        if not exits:
+            walk = cover(component, entry, None)
+        else:
+            walk = None
+            for transition in exits:
+                source, destination, _ = transition
+                candidate = (
+                    cover(component, entry, source)
+                    + [transition]
+                    + best_walks[(component_of[destination], destination)]
+                )
+                if walk is None or len(candidate) < len(walk):
+                    walk = candidate
+        best_walks[(component, entry)] = walk
+
+    path = best_walks[(component_of[start], start)]
+    return {
+        "path": path,
+        "coverage": len(set(path)),
+        "transition_count": sum(len(transitions) for transitions in model.successors),
+    }
+
+
+def cover_component(edges, start, end):
+    if not edges:
+        return []
+
+    adjacency = {}
+    balance = {}
+    for edge in edges:
+        source, destination, _ = edge
+        adjacency.setdefault(source, []).append(edge)
+        adjacency.setdefault(destination, [])
+        balance[source] = balance.get(source, 0) + 1
+        balance[destination] = balance.get(destination, 0) - 1
+
+    supplies = []
+    demands = []
+    for vertex in adjacency:
+        need = (vertex == start) - (vertex == end) - balance.get(vertex, 0)
+        if need > 0:
+            supplies.extend([vertex] * need)
+        elif need < 0:
+            demands.extend([vertex] * -need)
+    if end is None:
+        demands.append(None)
+
+    shortest_paths = {
+        vertex: shortest_path_tree(adjacency, vertex) for vertex in set(supplies)
+    }
+    costs = [
+        [
+            0 if demand is None else shortest_paths[supply][demand][0]
+            for demand in demands
+        ]
+        for supply in supplies
+    ]
+
+    multigraph = {vertex: list(reversed(out)) for vertex, out in adjacency.items()}
+    for row, column in enumerate(solve_assignment(costs)):
+        demand = demands[column]
+        if demand is None:
+            continue
+        vertex = demand
+        duplicated = []
+        while vertex != supplies[row]:
+            edge = shortest_paths[supplies[row]][vertex][1]
+            duplicated.append(edge)
+            vertex = edge[0]
+        for edge in duplicated:
+            multigraph[edge[0]].append(edge)
+
+    return euler_trail(multigraph, start)
+
+
+def shortest_path_tree(adjacency, source):
+    tree = {source: (0, None)}
+    queue = deque([source])
+    while queue:
+        vertex = queue.popleft()
+        for edge in adjacency[vertex]:
+            if edge[1] not in tree:
+                tree[edge[1]] = (tree[vertex][0] + 1, edge)
+                queue.append(edge[1])
+    return tree
+
+
+def solve_assignment(costs):
+    size = len(costs)
+    infinity = float("inf")
+    row_potential = [0] * (size + 1)
+    column_potential = [0] * (size + 1)
+    column_match = [0] * (size + 1)
+    way = [0] * (size + 1)
+
+    for row in range(1, size + 1):
+        column_match[0] = row
+        current_column = 0
+        min_slack = [infinity] * (size + 1)
+        used = [False] * (size + 1)
+        while True:
+            used[current_column] = True
+            current_row = column_match[current_column]
+            delta = infinity
+            next_column = 0
+            for column in range(1, size + 1):
+                if used[column]:
+                    continue
+                slack = (
+                    costs[current_row - 1][column - 1]
+                    - row_potential[current_row]
+                    - column_potential[column]
+                )
+                if slack < min_slack[column]:
+                    min_slack[column] = slack
+                    way[column] = current_column
+                if min_slack[column] < delta:
+                    delta = min_slack[column]
+                    next_column = column
+            for column in range(size + 1):
+                if used[column]:
+                    row_potential[column_match[column]] += delta
+                    column_potential[column] -= delta
+                else:
+                    min_slack[column] -= delta
+            current_column = next_column
+            if column_match[current_column] == 0:
+                break
+        while current_column:
+            previous_column = way[current_column]
+            column_match[current_column] = column_match[previous_column]
+            current_column = previous_column
+
+    assignment = [0] * size
+    for column in range(1, size + 1):
+        assignment[column_match[column] - 1] = column - 1
+    return assignment
+
+
+def euler_trail(multigraph, start):
+    stack = [(start, None)]
+    trail = []
+    while stack:
+        vertex, edge = stack[-1]
+        if multigraph[vertex]:
+            next_edge = multigraph[vertex].pop()
+            stack.append((next_edge[1], next_edge))
+        else:
+            stack.pop()
+            if edge is not None:
+                trail.append(edge)
+    trail.reverse()
+    return trail
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+from config import TRANSPOSITION_TABLE_SIZE
+
+
+class TranspositionTable:
+    def __init__(self, capacity=TRANSPOSITION_TABLE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def add_stats(self, stats):
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+        self.evictions += stats["evictions"]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,105 +1,82 @@
 import re
-import tkinter as tk
-import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import NamedTuple, Tuple
 
 import globals
-from config import MAX_SCALE_DIMENSION, RADIO_BUTTON_FONT
-
-
-class TransitionDialog(tk.Toplevel):
-    def __init__(self, parent, transitions_dict):
-        super().__init__(parent)
-        self.trans_value = tk.StringVar()
-        self.selected_option = None
-        self.user_made_choice = False
-
-        self.transient(parent)
-        self.grab_set()
-        sorted_transitions = dict(sorted(transitions_dict.items()))
-
-        if "" in sorted_transitions:
-            sorted_transitions[" "] = sorted_transitions[""]
-            del sorted_transitions[""]
-
-        if len(sorted_transitions) == 1:
-            self.selected_option = next(iter(sorted_transitions))
-            self.user_made_choice = True
-            self.destroy()
-            return
-
-        self.trans_value.set(next(iter(sorted_transitions)))
-
-        radio_button_font = RADIO_BUTTON_FONT
-
-        label = tk.Label(
-            self,
-            text="Select one of the following transitions:",
-            font=radio_button_font,
-        )
-        label.pack(pady=(10, 5), padx=25)
-
-        for key, label in sorted_transitions.items():
-            radio_button = tk.Radiobutton(
-                self,
-                text=key,
-                variable=self.trans_value,
-                value=key,
-                font=radio_button_font,
-            )
-            radio_button.pack(anchor=tk.W, pady=5, padx=50)
+from config import MAX_SCALE_DIMENSION, PARSE_CACHE_SIZE
 
-        ok_button = tk.Button(
-            self, text="OK", command=self.on_ok, font=radio_button_font
-        )
-        ok_button.pack(padx=20, pady=(50, 10))
 
-        self.center_window()
+def clean_state_representation(state):
+    state = state.replace("[", "").replace("]", "").replace("''", "")
+    state = state.strip()
+    return state
 
-        self.wait_window(self)
 
-    def center_window(self):
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"{width}x{height}+{x}+{y}")
+class Configuration(NamedTuple):
+    active: Tuple[str, ...]
+    remembered: Tuple[str, ...]
 
-    def on_ok(self):
-        self.selected_option = self.trans_value.get()
-        self.user_made_choice = True
-        self.grab_release()
-        self.destroy()
+    def file_representation(self):
+        active_str = ",".join(self.active) if self.active else ""
+        remembered_str = ",".join(self.remembered) if self.remembered else ""
 
-    def on_close(self):
-        self.grab_release()
-        self.destroy()
+        if remembered_str:
+            return f"{active_str}({remembered_str})"
+        else:
+            return active_str
 
 
-def ask_user_for_transition(transitions_dict, parent):
-    dialog = TransitionDialog(parent, transitions_dict)
-    return dialog.selected_option
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def file_state_representation(state):
+    return parse_configuration(state).file_representation()
 
 
-def clean_state_representation(state):
-    state = state.replace("[", "").replace("]", "").replace("''", "")
-    state = state.strip()
-    return state
+def parse_state(state_str):
+    configuration = parse_configuration(state_str)
+    return list(configuration.active), list(configuration.remembered)
 
 
-def file_state_representation(state):
-    active, remembered = parse_state(state)
+def read_transitions_from_file(file_path):
+    globals.transitions = {}
+    transition_counter = {}
 
-    active_str = ",".join(active) if active else ""
-    remembered_str = ",".join(remembered) if remembered else ""
+    def add_transition(source, dest, label):
+        source_key = file_state_representation(source)
+        dest_key = file_state_representation(dest)
 
-    if remembered_str:
-        return f"{active_str}({remembered_str})"
-    else:
-        return active_str
+        if source_key not in globals.transitions:
+            globals.transitions[source_key] = {}
 
-
-def parse_state(state_str):
+        if dest_key not in globals.transitions[source_key]:
+            globals.transitions[source_key][dest_key] = {label: "Option 1"}
+        else:
+            counter = transition_counter.get((source_key, dest_key), 1) + 1
+            transition_counter[(source_key, dest_key)] = counter
+            globals.transitions[source_key][dest_key][label] = f"Option {counter}"
+
+    with open(file_path, "r") as file:
+        for line in file.readlines():
+            line = line.strip()
+
+            if line.startswith("[*] -> "):
+                state_str = line[6:].strip()
+                active, remembered = parse_state(state_str)
+                globals.current_state["active"] = active
+                globals.current_state["remembered"] = remembered
+                globals.initial_state_key = file_state_representation(state_str)
+                globals.transitions[globals.initial_state_key] = {}
+            elif "->" in line:
+                parts = line.split("->")
+                source_str = parts[0].strip()
+                dest_and_label = parts[1].strip()
+                dest_str, label = map(str.strip, dest_and_label.split(":"))
+                add_transition(source_str, dest_str, label)
+
+    return globals.current_state, globals.transitions
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_configuration(state_str):
     if "(" in state_str and ")" in state_str:
         parts = state_str.split("(")
         parts[1] = parts[1].strip(")")
@@ -123,7 +100,7 @@ def parse_state(state_str):
         active = state_str.split(", ") if "," in state_str else [state_str]
         remembered = []
 
-    return active, remembered
+    return Configuration(tuple(active), tuple(remembered))
 
 
 def state_representation(state):
@@ -180,15 +157,14 @@ def svg_path_to_coords(path_str):
     return None
 
 
-def get_svg_dimensions(svg_content, max_dimension=MAX_SCALE_DIMENSION):
-    root = ET.fromstring(svg_content)
+def get_svg_root_dimensions(attributes, max_dimension=MAX_SCALE_DIMENSION):
     width = height = None
 
-    if "width" in root.attrib and "height" in root.attrib:
-        width = float(re.sub(r"[^\d.]", "", root.attrib["width"]))
-        height = float(re.sub(r"[^\d.]", "", root.attrib["height"]))
-    elif "viewBox" in root.attrib:
-        viewBox = [float(v) for v in root.attrib["viewBox"].split()]
+    if "width" in attributes and "height" in attributes:
+        width = float(re.sub(r"[^\d.]", "", attributes["width"]))
+        height = float(re.sub(r"[^\d.]", "", attributes["height"]))
+    elif "viewBox" in attributes:
+        viewBox = [float(v) for v in attributes["viewBox"].split()]
         width, height = viewBox[2], viewBox[3]
     else:
         raise ValueError("SVG dimensions could not be determined.")
@@ -198,28 +174,3 @@ def get_svg_dimensions(svg_content, max_dimension=MAX_SCALE_DIMENSION):
         height /= 1.5
 
     return width, height
-
-
-def update_transition_display(transition_trace_label, reset_button, undo_button):
-    formatted_trace = [str(transition) for transition in globals.transition_trace]
-
-    transition_trace_label.config(state=tk.NORMAL)
-    transition_trace_label.delete("1.0", tk.END)
-    if formatted_trace:
-        transition_trace_label.insert(tk.END, ", ".join(formatted_trace) + ", ")
-    else:
-        transition_trace_label.insert(tk.END, "")
-    transition_trace_label.see(tk.END)
-    transition_trace_label.config(state=tk.DISABLED)
-    reset_button["state"] = "normal" if globals.transition_trace else "disabled"
-    undo_button["state"] = "normal" if globals.transition_trace else "disabled"
-
-
-def show_popup(message, x, y):
-    if globals.debug_mode:
-        popup = tk.Toplevel()
-        popup.title("Information")
-        label_coords = tk.Label(popup, text=f"Clicked Coordinates (x, y): ({x}, {y})")
-        label_state = tk.Label(popup, text=f"State: {message}")
-        label_coords.pack()
-        label_state.pack()
@@ -0,0 +1,346 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from config import (
+    ANALYSIS_START_METHOD,
+    ANALYSIS_WORKERS,
+    EXACT_NODE_ANALYSIS_LIMIT,
+    NODE_ANALYSIS_BEAM_WIDTH,
+    NODE_ANALYSIS_PROBE_LIMIT,
+    NODE_ANALYSIS_SEARCH_LIMIT,
+    PARALLEL_SPLIT_DEPTH,
+    SHARED_BEST_INTERVAL,
+)
+from transposition_table import TranspositionTable
+
+search_model = None
+search_progress = None
+search_best = None
+search_bound = None
+search_limit = None
+
+
+def max_node_coverage(model, start):
+    components, component_of = model.strongly_connected_components()
+    component_successors = model.component_successors()
+    coverage = [0] * len(components)
+
+    for component, members in enumerate(components):
+        coverage[component] = len(members) + max(
+            (coverage[successor] for successor in component_successors[component]),
+            default=0,
+        )
+
+    return coverage[component_of[start]]
+
+
+def find_max_node_walk(model, progress=None, workers=ANALYSIS_WORKERS):
+    start = model.initial
+    reachable_count = len(model.reachable_from(start))
+    upper_bound = max_node_coverage(model, start)
+    table = TranspositionTable()
+
+    if reachable_count <= EXACT_NODE_ANALYSIS_LIMIT:
+        walk, path, truncated = exact_max_node_walk(
+            model,
+            [start],
+            [],
+            progress,
+            search_limit=NODE_ANALYSIS_SEARCH_LIMIT,
+            table=table,
+        )
+        beam = False
+    else:
+        walk, path, truncated = exact_max_node_walk(
+            model,
+            [start],
+            [],
+            progress,
+            search_limit=(
+                NODE_ANALYSIS_PROBE_LIMIT if workers > 1 else NODE_ANALYSIS_SEARCH_LIMIT
+            ),
+            table=table,
+        )
+        if workers > 1 and (
+            len(set(walk)) < upper_bound or len(path) > upper_bound - 1
+        ):
+            walk, path = parallel_max_node_walk(
+                model, start, upper_bound, progress, table, workers, (walk, path)
+            )
+        if len(set(walk)) < upper_bound:
+            walk, path = best_max_node_candidate(
+                [
+                    (walk, path),
+                    beam_max_node_walk(model, start, reachable_count, progress),
+                ]
+            )
+        beam = True
+    stopped = progress is not None and progress.stopped
+
+    return {
+        "walk": walk,
+        "path": path,
+        "coverage": len(set(walk)),
+        "upper_bound": upper_bound,
+        "exact": not beam and not stopped and not truncated,
+        "beam": beam,
+        "table_stats": table.stats(),
+    }
+
+
+def exact_max_node_walk(
+    model,
+    walk,
+    path,
+    progress=None,
+    shared_best=None,
+    upper_bound=None,
+    search_limit=None,
+    table=None,
+):
+    if table is None:
+        table = TranspositionTable()
+    state_bits = len(model.configurations).bit_length()
+    walk = list(walk)
+    path = list(path)
+    state = walk[-1]
+    mask = 0
+    for visited in walk:
+        mask |= 1 << visited
+    start_key = (mask << state_bits) | state
+    table.put(start_key, len(path))
+    on_path = {start_key}
+    frames = [(state, mask, ordered_successors(model, state, mask))]
+    best_coverage, best_walk, best_path = mask.bit_count(), list(walk), list(path)
+    closure = model.reachability_closure()
+    bound_coverage, bound_length = best_coverage, len(best_path)
+    explored = 0
+    truncated = False
+
+    while frames:
+        state, mask, successors = frames[-1]
+        step = next(successors, None)
+        if step is None:
+            frames.pop()
+            on_path.discard((mask << state_bits) | state)
+            if frames:
+                walk.pop()
+                path.pop()
+            continue
+
+        next_state, label = step
+        next_mask = mask | (1 << next_state)
+        key = (next_mask << state_bits) | next_state
+        depth = len(path) + 1
+        if key in on_path:
+            continue
+        seen_depth = table.get(key)
+        if seen_depth is not None and seen_depth <= depth:
+            continue
+
+        explored += 1
+        if progress is not None and progress.tick(explored, best_coverage):
+            break
+        if search_limit is not None and explored > search_limit:
+            truncated = True
+            break
+        if shared_best is not None and explored % SHARED_BEST_INTERVAL == 0:
+            shared_coverage, shared_length = shared_best[:]
+            if (shared_coverage, -shared_length) > (bound_coverage, -bound_length):
+                bound_coverage, bound_length = shared_coverage, shared_length
+            if bound_coverage >= upper_bound and bound_length <= upper_bound - 1:
+                break
+
+        table.put(key, depth)
+        coverage = next_mask.bit_count()
+        if coverage > best_coverage or (
+            coverage == best_coverage and depth < len(best_path)
+        ):
+            best_coverage = coverage
+            best_walk = walk + [next_state]
+            best_path = path + [(state, next_state, label)]
+            if (coverage, -depth) > (bound_coverage, -bound_length):
+                bound_coverage, bound_length = coverage, depth
+            if shared_best is not None:
+                with shared_best.get_lock():
+                    if (coverage, -depth) > (shared_best[0], -shared_best[1]):
+                        shared_best[:] = [coverage, depth]
+
+        bound = coverage + (closure[next_state] & ~next_mask).bit_count()
+        if bound < bound_coverage or (
+            bound == bound_coverage
+            and depth + max(bound_coverage - coverage, 1) >= bound_length
+        ):
+            continue
+
+        on_path.add(key)
+        walk.append(next_state)
+        path.append((state, next_state, label))
+        frames.append(
+            (next_state, next_mask, ordered_successors(model, next_state, next_mask))
+        )
+
+    return best_walk, best_path, truncated
+
+
+def ordered_successors(model, state, mask):
+    return iter(
+        sorted(
+            model.successors[state],
+            key=lambda successor: (mask >> successor[0]) & 1,
+        )
+    )
+
+
+def split_max_node_walk(model, start, split_depth):
+    seen = {(start, 1 << start)}
+    candidates = [([start], [])]
+    layer = [([start], [], 1 << start)]
+
+    for _ in range(split_depth):
+        next_layer = []
+        for walk, path, mask in layer:
+            state = walk[-1]
+            for next_state, label in model.successors[state]:
+                next_mask = mask | (1 << next_state)
+                if (next_state, next_mask) in seen:
+                    continue
+                seen.add((next_state, next_mask))
+                next_walk = walk + [next_state]
+                next_path = path + [(state, next_state, label)]
+                next_layer.append((next_walk, next_path, next_mask))
+                candidates.append((next_walk, next_path))
+        layer = next_layer
+
+    return candidates, [(walk, path) for walk, path, _ in layer]
+
+
+def init_search_worker(model, progress, shared_best, upper_bound, unit_limit):
+    global search_model, search_progress, search_best, search_bound, search_limit
+    search_model = model
+    search_progress = progress
+    search_best = shared_best
+    search_bound = upper_bound
+    search_limit = unit_limit
+
+
+def search_unit(walk, path):
+    if search_progress is not None:
+        search_progress.next_report = 0
+    table = TranspositionTable()
+    walk, path, _ = exact_max_node_walk(
+        search_model,
+        walk,
+        path,
+        search_progress,
+        search_best,
+        search_bound,
+        search_limit,
+        table=table,
+    )
+    stop_reason = search_progress.stop_reason if search_progress else None
+    return walk, path, stop_reason, table.stats()
+
+
+def parallel_max_node_walk(
+    model,
+    start,
+    upper_bound,
+    progress=None,
+    table=None,
+    workers=ANALYSIS_WORKERS,
+    probe=None,
+):
+    candidates, units = split_max_node_walk(model, start, PARALLEL_SPLIT_DEPTH)
+    if probe is not None:
+        candidates.append(probe)
+    walk, path = best_max_node_candidate(candidates)
+    context = multiprocessing.get_context(ANALYSIS_START_METHOD)
+    shared_best = context.Array("i", [len(set(walk)), len(path)])
+    unit_limit = -(-NODE_ANALYSIS_SEARCH_LIMIT * workers // max(len(units), 1))
+
+    if len(units) <= 1:
+        for walk, path in units:
+            candidates.append(
+                exact_max_node_walk(
+                    model,
+                    walk,
+                    path,
+                    progress,
+                    shared_best,
+                    upper_bound,
+                    NODE_ANALYSIS_SEARCH_LIMIT,
+                    table=table,
+                )[:2]
+            )
+        return best_max_node_candidate(candidates)
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(units)),
+        mp_context=context,
+        initializer=init_search_worker,
+        initargs=(model, progress, shared_best, upper_bound, unit_limit),
+    ) as pool:
+        futures = [pool.submit(search_unit, walk, path) for walk, path in units]
+        for future in futures:
+            walk, path, stop_reason, stats = future.result()
+            candidates.append((walk, path))
+            if table is not None:
+                table.add_stats(stats)
+            if stop_reason is not None and progress is not None:
+                progress.stop(stop_reason)
+
+    return best_max_node_candidate(candidates)
+
+
+def best_max_node_candidate(candidates):
+    return max(
+        candidates,
+        key=lambda candidate: (len(set(candidate[0])), -len(candidate[1])),
+    )
+
+
+def beam_max_node_walk(model, start, reachable_count, progress=None):
+    steps = [(start, 1 << start, None, None)]
+    seen = {(start, 1 << start)}
+    frontier = [0]
+    best_step, best_coverage = 0, 1
+    stale_layers = 0
+
+    while frontier and stale_layers < reachable_count:
+        candidates = []
+        for step_index in frontier:
+            state, mask, _, _ = steps[step_index]
+            for next_state, label in model.successors[state]:
+                next_mask = mask | (1 << next_state)
+                if (next_state, next_mask) in seen:
+                    continue
+                seen.add((next_state, next_mask))
+                steps.append((next_state, next_mask, step_index, label))
+                candidates.append(len(steps) - 1)
+
+        if progress is not None and progress.tick(len(seen), best_coverage):
+            break
+
+        candidates.sort(key=lambda step_index: -steps[step_index][1].bit_count())
+        frontier = candidates[:NODE_ANALYSIS_BEAM_WIDTH]
+
+        stale_layers += 1
+        if frontier and steps[frontier[0]][1].bit_count() > best_coverage:
+            best_step = frontier[0]
+            best_coverage = steps[best_step][1].bit_count()
+            stale_layers = 0
+
+    walk = []
+    path = []
+    step_index = best_step
+    while step_index is not None:
+        state, _, previous_index, label = steps[step_index]
+        walk.append(state)
+        if previous_index is not None:
+            path.append((steps[previous_index][0], state, label))
+        step_index = previous_index
+    walk.reverse()
+    path.reverse()
+
+    return walk, path
@@ -0,0 +1,85 @@
+import json
+import os
+import random
+
+import pytest
+from config import XML_TYPE_1, XML_TYPE_2
+from svg_parser import build_state_hierarchy, load_svg
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "examples")
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as file:
+        return json.load(file)
+
+
+EXPECTED_TYPE2 = load_fixture("type2_elements.json")
+EXPECTED_TYPE1 = load_fixture("type1_elements.json")
+
+
+def assert_parse_matches_baseline(file_name, expected_type, expected):
+    xml_type, elements, hierarchy, _ = load_svg(os.path.join(EXAMPLES_DIR, file_name))
+
+    assert xml_type == expected_type
+    assert [[state, list(coordinates)] for state, coordinates in elements] == expected[
+        file_name
+    ]["elements"]
+    assert {state: list(children) for state, children in hierarchy.items()} == expected[
+        file_name
+    ]["hierarchy"]
+
+
+@pytest.mark.parametrize("file_name", sorted(EXPECTED_TYPE1))
+def test_type1_parse_matches_baseline(file_name):
+    assert_parse_matches_baseline(file_name, XML_TYPE_1, EXPECTED_TYPE1)
+
+
+@pytest.mark.parametrize("file_name", sorted(EXPECTED_TYPE2))
+def test_type2_parse_matches_baseline(file_name):
+    assert_parse_matches_baseline(file_name, XML_TYPE_2, EXPECTED_TYPE2)
+
+
+def pairwise_state_hierarchy(states):
+    hierarchy = {state: [] for state, _ in states}
+    states = sorted(states, key=lambda x: (x[1][1] - x[1][0]) * (x[1][3] - x[1][2]))
+    for i, (child_state, child_coords) in enumerate(states):
+        for parent_state, parent_coords in states[i + 1 :]:
+            if (
+                parent_coords[0] <= child_coords[0]
+                and parent_coords[1] >= child_coords[1]
+                and parent_coords[2] <= child_coords[2]
+                and parent_coords[3] >= child_coords[3]
+            ):
+                hierarchy[parent_state].append(child_state)
+                break
+    return hierarchy
+
+
+def random_nested_states(seed):
+    rng = random.Random(seed)
+    states = [("Root", (0.0, 1000.0, 0.0, 1000.0))]
+    for i in range(rng.randint(1, 80)):
+        x1, x2, y1, y2 = rng.choice(states)[1]
+        if rng.random() < 0.1:
+            box = (x1, x2, y1, y2)
+        else:
+            left = rng.uniform(x1, x2)
+            top = rng.uniform(y1, y2)
+            box = (left, rng.uniform(left, x2), top, rng.uniform(top, y2))
+        states.append((f"S{rng.randint(0, i)}", box))
+    return states
+
+
+@pytest.mark.parametrize(
+    "states",
+    [
+        [(f"C{depth}", (-depth, depth, -depth, depth)) for depth in range(300)],
+        [(f"K{depth}", (0, depth, 0, depth)) for depth in range(300)],
+        [(f"K{depth}", (-depth, 0, -depth, 0)) for depth in range(300)],
+    ]
+    + [random_nested_states(seed) for seed in range(50)],
+)
+def test_state_hierarchy_matches_pairwise_scan(states):
+    assert build_state_hierarchy(states) == pairwise_state_hierarchy(states)
@@ -0,0 +1,118 @@
+import itertools
+import random
+from collections import deque
+
+import pytest
+from state_model import StateModel
+from transition_cover import euler_trail, find_max_transition_walk, solve_assignment
+
+
+def random_transitions(seed, size):
+    generator = random.Random(seed)
+    transitions = {f"S{i}": {} for i in range(size)}
+    for i in range(generator.randint(size, 2 * size)):
+        source = f"S{generator.randrange(size)}"
+        destination = f"S{generator.randrange(size)}"
+        transitions[source].setdefault(destination, {})[f"t{i}"] = "Option 1"
+    return transitions
+
+
+def brute_force_max_transition_walk(model):
+    edges = [
+        (source, destination)
+        for source, transitions in enumerate(model.successors)
+        for destination, _ in transitions
+    ]
+    start = (model.initial, 0)
+    depths = {start: 0}
+    queue = deque([start])
+    best = (0, 0)
+
+    while queue:
+        state, mask = queue.popleft()
+        depth = depths[(state, mask)]
+        best = max(best, (mask.bit_count(), -depth))
+        for index, (source, destination) in enumerate(edges):
+            key = (destination, mask | (1 << index))
+            if source == state and key not in depths:
+                depths[key] = depth + 1
+                queue.append(key)
+
+    return best[0], -best[1]
+
+
+def assert_valid_walk(model, path):
+    state = model.initial
+    for source, destination, label in path:
+        assert source == state
+        assert (destination, label) in model.successors[source]
+        state = destination
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_max_transition_walk_matches_brute_force(seed):
+    model = StateModel(random_transitions(seed, 2 + seed % 5), "S0")
+
+    result = find_max_transition_walk(model)
+
+    assert_valid_walk(model, result["path"])
+    assert (result["coverage"], len(result["path"])) == (
+        brute_force_max_transition_walk(model)
+    )
+
+
+def test_max_transition_walk_on_unbalanced_components():
+    transitions = {
+        "A": {"B": {"a1": "Option 1", "a2": "Option 2"}, "X": {"x": "Option 1"}},
+        "B": {"A": {"b": "Option 1"}, "C": {"c": "Option 1"}},
+        "C": {"D": {"d": "Option 1"}},
+        "D": {"C": {"e": "Option 1"}, "E": {"f": "Option 1"}},
+        "E": {"C": {"g": "Option 1"}, "F": {"h": "Option 1"}},
+        "F": {},
+        "X": {},
+    }
+    model = StateModel(transitions, "A")
+
+    result = find_max_transition_walk(model)
+
+    assert_valid_walk(model, result["path"])
+    assert result["transition_count"] == 10
+    assert result["coverage"] == 9
+    assert len(result["path"]) == 12
+    assert brute_force_max_transition_walk(model) == (9, 12)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_solve_assignment_is_optimal(seed):
+    generator = random.Random(seed)
+    size = 1 + seed % 6
+    costs = [[generator.randint(0, 9) for _ in range(size)] for _ in range(size)]
+
+    assignment = solve_assignment(costs)
+
+    assert sorted(assignment) == list(range(size))
+    assert sum(costs[row][column] for row, column in enumerate(assignment)) == min(
+        sum(costs[row][column] for row, column in enumerate(permutation))
+        for permutation in itertools.permutations(range(size))
+    )
+
+
+def test_euler_trail_uses_every_edge_once():
+    edges = [
+        (0, 1, "a"),
+        (1, 2, "b"),
+        (2, 0, "c"),
+        (0, 3, "d"),
+        (3, 0, "e"),
+        (0, 1, "f"),
+        (1, 0, "g"),
+    ]
+    multigraph = {vertex: [] for vertex in range(4)}
+    for edge in edges:
+        multigraph[edge[0]].append(edge)
+
+    trail = euler_trail(multigraph, 0)
+
+    assert sorted(trail) == sorted(edges)
+    assert trail[0][0] == 0
+    assert all(edge[1] == next_edge[0] for edge, next_edge in zip(trail, trail[1:]))
@@ -0,0 +1,102 @@
+import random
+from collections import deque
+
+import pytest
+import walk_search
+from config import PARALLEL_SPLIT_DEPTH
+from state_model import StateModel
+from walk_search import (
+    find_max_node_walk,
+    max_node_coverage,
+    parallel_max_node_walk,
+    split_max_node_walk,
+)
+
+
+def random_transitions(seed, size, min_degree=0):
+    generator = random.Random(seed)
+    transitions = {}
+    for i in range(size):
+        destinations = transitions.setdefault(f"S{i}", {})
+        for j in range(generator.randint(min_degree, 3)):
+            destination = f"S{generator.randrange(size)}"
+            destinations.setdefault(destination, {})[f"t{i}_{j}"] = "Option 1"
+    return transitions
+
+
+def brute_force_max_node_walk(model):
+    start = model.initial
+    depths = {(start, 1 << start): 0}
+    queue = deque(depths)
+    best = (1, 0)
+
+    while queue:
+        state, mask = queue.popleft()
+        depth = depths[(state, mask)]
+        best = max(best, (mask.bit_count(), -depth))
+        for next_state, _ in model.successors[state]:
+            key = (next_state, mask | (1 << next_state))
+            if key not in depths:
+                depths[key] = depth + 1
+                queue.append(key)
+
+    return best[0], -best[1]
+
+
+def assert_valid_walk(model, walk, path):
+    assert walk[0] == model.initial
+    assert len(walk) == len(path) + 1
+    for (source, destination, label), state, next_state in zip(path, walk, walk[1:]):
+        assert (source, destination) == (state, next_state)
+        assert (destination, label) in model.successors[source]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_max_node_walk_matches_brute_force(seed):
+    model = StateModel(random_transitions(seed, 3 + seed % 6), "S0")
+
+    result = find_max_node_walk(model, workers=1)
+
+    assert_valid_walk(model, result["walk"], result["path"])
+    assert (result["coverage"], len(result["path"])) == brute_force_max_node_walk(model)
+    assert result["exact"]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_parallel_max_node_walk_matches_brute_force(seed):
+    model = StateModel(random_transitions(seed, 8, min_degree=2), "S0")
+    _, units = split_max_node_walk(model, model.initial, PARALLEL_SPLIT_DEPTH)
+    assert len(units) > 1
+
+    walk, path = parallel_max_node_walk(
+        model, model.initial, max_node_coverage(model, model.initial), workers=2
+    )
+
+    assert_valid_walk(model, walk, path)
+    assert (len(set(walk)), len(path)) == brute_force_max_node_walk(model)
+
+
+def test_parallel_max_node_walk_keeps_winning_probe(monkeypatch):
+    transitions = {"S0": {"A1": {"a": "Option 1"}, "B1": {"b": "Option 1"}}}
+    for i in range(1, 9):
+        transitions[f"A{i}"] = {f"A{i + 1}": {f"a{i}": "Option 1"}}
+        transitions[f"B{i}"] = {f"B{i + 1}": {f"b{i}": "Option 1"}}
+    model = StateModel(transitions, "S0")
+    walk = [model.initial] + [model.configuration_id(f"A{i}") for i in range(1, 10)]
+    path = [
+        (state, next_state, label)
+        for state, next_state, label in zip(
+            walk, walk[1:], ["a"] + [f"a{i}" for i in range(1, 9)]
+        )
+    ]
+    monkeypatch.setattr(walk_search, "NODE_ANALYSIS_SEARCH_LIMIT", 1)
+
+    result = parallel_max_node_walk(
+        model,
+        model.initial,
+        max_node_coverage(model, model.initial),
+        workers=2,
+        probe=(walk, path),
+    )
+
+    assert result == (walk, path)